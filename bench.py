@@ -0,0 +1,514 @@
+import os
+import sys
+import csv
+import asyncio
+import time
+import json
+import tempfile
+import threading
+from itertools import product
+import http.client
+from datetime import datetime, timedelta, UTC
+from typing import List
+import domain
+from domain import create_event, create_user, get_event, _list_events_sql, _search_events_query, _search_tsquery
+import domain_async
+from concurrent.futures import ThreadPoolExecutor
+from db import get_conn, close_async_pool
+from importer import import_events
+from hashing import BCRYPT_ROUNDS, HASH_WORKERS
+import holds
+import server
+
+# ---------- Contención en ventas ----------
+def bench_contention(mode: str, workers: int = 200, seats: int = 100) -> dict:
+    """
+    Lanza ``workers`` hilos que compran 1 entrada del mismo evento (escalado de R15-01).
+
+    Args:
+        mode (str): Modo de venta a medir (lock o conditional).
+        workers (int, optional): Cantidad de hilos compradores. Defaults to 200.
+        seats (int, optional): Cupos totales del evento. Defaults to 100.
+
+    Returns:
+        dict: Resultado con (mode, workers, ok, err, sold, oversell, seconds, sales_per_s).
+    """
+    domain.SALE_MODE = mode
+    e = create_event(f"Bench {mode}", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, seats)
+    uid = create_user(f"bench_{mode}_{time.time_ns()}", "pw", "admin")
+    results = []
+    barrier = threading.Barrier(workers)
+    def t():
+        barrier.wait()
+        try:
+            domain.sell(e, 1, uid)
+            results.append("ok")
+        except Exception:
+            results.append("err")
+    threads = [threading.Thread(target=t) for _ in range(workers)]
+    t0 = time.perf_counter()
+    for th in threads: th.start()
+    for th in threads: th.join()
+    elapsed = time.perf_counter() - t0
+    sold = get_event(e)[7]
+    return {
+        "mode": mode,
+        "workers": workers,
+        "ok": results.count("ok"),
+        "err": results.count("err"),
+        "sold": sold,
+        "oversell": sold > seats,
+        "seconds": round(elapsed, 4),
+        "sales_per_s": round(results.count("ok") / elapsed, 1),
+    }
+
+# ---------- Evento muy demandado (shards) ----------
+def bench_hot_event(sales: int = 4000, concurrency=(1, 8, 64), shards: int = 16) -> List[dict]:
+    """
+    Mide ventas/segundo de 1 entrada sobre un mismo evento con SALE_MODE=conditional y con SALE_MODE=sharded.
+
+    Args:
+        sales (int, optional): Ventas por medición. Defaults to 4000.
+        concurrency (tuple, optional): Hilos compradores a medir. Defaults to (1, 8, 64).
+        shards (int, optional): Shards del evento en modo sharded. Defaults to 16.
+
+    Returns:
+        List[dict]: Una fila por (modo, hilos) con (ok, sold, seconds, sales_per_s).
+    """
+    uid = create_user(f"bench_hot_{time.time_ns()}", "pw", "admin")
+    results = []
+    for mode in ("conditional", "sharded"):
+        domain.SALE_MODE = mode
+        for n in concurrency:
+            e = create_event(f"Bench hot {mode} {n}", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, sales * 2)
+            if mode == "sharded":
+                domain.shard_event(e, shards)
+            def one(_):
+                try:
+                    domain.sell(e, 1, uid)
+                    return True
+                except ValueError:
+                    return False
+            with ThreadPoolExecutor(max_workers=n) as ex:
+                t0 = time.perf_counter()
+                ok = sum(ex.map(one, range(sales)))
+                elapsed = time.perf_counter() - t0
+            domain.consolidate_shards(e)
+            with get_conn() as c, c.cursor() as cur:
+                cur.execute("SELECT seats_sold FROM events WHERE id=%s", (e,))
+                sold = cur.fetchone()[0]
+            results.append({"mode": mode, "workers": n, "ok": ok, "sold": sold,
+                            "seconds": round(elapsed, 4), "sales_per_s": round(ok / elapsed, 1)})
+    return results
+
+# ---------- Planes de list_events ----------
+def plan_cases() -> dict:
+    """
+    Genera un caso por cada combinación de filtros que acepta domain._list_events_query.
+
+    Todos llevan ``limit`` (la consola y la API HTTP siempre paginan) y se prueban con y sin ``after``.
+
+    Returns:
+        dict: Nombre de la combinación -> argumentos de list_events.
+    """
+    now = datetime.now(UTC)
+    values = {
+        "q": "zzqx",
+        "category": "Taller",
+        "dt_from": now,
+        "dt_to": now + timedelta(days=1),
+    }
+    cases = {}
+    for mask in product((False, True), repeat=len(values)):
+        for status in ("", "soldout", "upcoming", "past"):
+            for after in (None, (now, 0)):
+                filters = {k: v for k, v, on in zip(values, values.values(), mask) if on}
+                if status:
+                    filters["status"] = status
+                if after:
+                    filters["after"] = after
+                filters["limit"] = 20
+                name = "+".join([k for k, on in zip(values, mask) if on]
+                                + ([f"status={status}"] if status else []) + (["after"] if after else []) + ["limit"])
+                cases[name] = filters
+    return cases
+
+def seed_events(n: int = 1_000_000):
+    """
+    Inserta ``n`` eventos sintéticos (prefijo 'Bench ') si aún no existen.
+
+    Args:
+        n (int, optional): Cantidad de eventos a generar. Defaults to 1_000_000.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM events WHERE name LIKE 'Bench evento %'")
+        have = cur.fetchone()[0]
+        if have >= n:
+            return
+        cur.execute(
+            """
+            INSERT INTO events(name,description,starts_at,category,price,seats_total,seats_sold)
+            SELECT 'Bench evento ' || g, 'Descripción ' || md5(g::text) || '. ' || (ARRAY[
+                       'Concierto de rock al aire libre', 'Taller de cerámica para principiantes',
+                       'Charla de programación en Python', 'Obra de teatro familiar',
+                       'Festival de música electrónica', 'Taller de fotografía nocturna',
+                       'Charla sobre astronomía y planetas', 'Exposición de pintura contemporánea'])[1 + g %% 8]
+                       || CASE WHEN g %% 1000 = 0 THEN ' con invitado sorpresa' ELSE '' END,
+                   now() - interval '365 days' + (g %% 730) * interval '1 day' + (g %% 1440) * interval '1 minute',
+                   (ARRAY['Charla','Taller','Show','Otro'])[1 + g %% 4], (g %% 50) * 1000, 100,
+                   CASE WHEN g %% 100 = 0 THEN 100 ELSE g %% 100 END
+            FROM generate_series(%s, %s) g
+            """,
+            (have + 1, n),
+        )
+        cur.execute("ANALYZE events")
+
+def _plan_nodes(plan: dict):
+    """Recorre el plan de EXPLAIN (FORMAT JSON) retornando todos sus nodos."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+def check_list_plans() -> dict:
+    """
+    Verifica con EXPLAIN que cada combinación de filtros de list_events (plan_cases) usa un índice.
+
+    Returns:
+        dict: Por combinación, los tipos de nodo que acceden a ``events``.
+
+    Raises:
+        RuntimeError: Si alguna combinación recurre a un Seq Scan sobre ``events``.
+    """
+    result = {}
+    with get_conn() as c, c.cursor() as cur:
+        for name, filters in plan_cases().items():
+            sql, params = _list_events_sql(**filters)
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cur.fetchone()[0][0]["Plan"]
+            scans = [n["Node Type"] for n in _plan_nodes(plan) if n.get("Relation Name") == "events"]
+            result[name] = scans
+    seq = [name for name, scans in result.items() if "Seq Scan" in scans]
+    if seq:
+        raise RuntimeError(f"list_events usa Seq Scan en {len(seq)} combinaciones: {', '.join(seq)}")
+    return result
+
+# ---------- Búsqueda de texto completo ----------
+SEARCH_CASES = ("sorpresa", "ceramica", "progra", "concierto", "taller fotogr")
+
+def bench_search(repeats: int = 50) -> List[dict]:
+    """
+    Compara list_events(q=...) (ILIKE) con search_events (tsvector + GIN) sobre los eventos de seed_events.
+
+    Returns:
+        List[dict]: Por texto buscado y modo, coincidencias en la primera página, p50/p99 en ms y, para
+        search_events, si el plan usa el índice events_search_vector_idx.
+    """
+    results = []
+    for q in SEARCH_CASES:
+        for mode, fn in (("ilike", lambda: domain.list_events(q=q, limit=20)),
+                         ("fts", lambda: domain.search_events(q, limit=20))):
+            rows = fn()
+            times = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                fn()
+                times.append((time.perf_counter() - t0) * 1000)
+            r = {"q": q, "mode": mode, "rows": len(rows),
+                 "p50_ms": round(_percentile(times, 0.50), 2), "p99_ms": round(_percentile(times, 0.99), 2)}
+            if mode == "fts":
+                with get_conn() as c, c.cursor() as cur:
+                    cur.execute("EXPLAIN (FORMAT JSON) " + _search_events_query(False, False, False),
+                                (_search_tsquery(q), 20, 0))
+                    plan = cur.fetchone()[0][0]["Plan"]
+                r["uses_index"] = any(n.get("Index Name") == "events_search_vector_idx" for n in _plan_nodes(plan))
+            results.append(r)
+    return results
+
+# ---------- Importación masiva ----------
+def bench_import(n: int = 50_000, chunk_size: int = 5000) -> dict:
+    """
+    Mide el throughput de importer.import_events sobre un CSV sintético.
+
+    Args:
+        n (int, optional): Cantidad de filas del archivo. Defaults to 50_000.
+        chunk_size (int, optional): Filas por transacción. Defaults to 5000.
+
+    Returns:
+        dict: Resultado con (rows, imported, errors, seconds, rows_per_s).
+    """
+    cats = ("Charla", "Taller", "Show", "Otro")
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["name", "description", "starts_at", "category", "price", "seats_total"])
+            for i in range(n):
+                w.writerow([f"Bench import {i}", "x", f"{1 + i % 28:02d}-{1 + i % 12:02d}-2027 20:00", cats[i % 4], i % 50 * 1000, 100])
+        t0 = time.perf_counter()
+        result = import_events(path, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - t0
+    finally:
+        os.remove(path)
+    return {
+        "rows": n,
+        "imported": result["imported"],
+        "errors": len(result["errors"]),
+        "seconds": round(elapsed, 4),
+        "rows_per_s": round(result["imported"] / elapsed, 1),
+    }
+
+# ---------- Login ----------
+def bench_login(logins: int = 200, concurrency=(1, 4, 16)) -> List[dict]:
+    """
+    Mide logins/segundo de auth_user con distintas cantidades de clientes concurrentes.
+
+    Args:
+        logins (int, optional): Logins por medición. Defaults to 200.
+        concurrency (tuple, optional): Clientes concurrentes a medir. Defaults to (1, 4, 16).
+
+    Returns:
+        List[dict]: Una fila por concurrencia con (rounds, workers, seconds, logins_per_s).
+    """
+    username = f"bench_login_{time.time_ns()}"
+    create_user(username, "pw", "viewer")
+    results = []
+    rate_limit_before = domain.LOGIN_RATE_LIMIT
+    domain.LOGIN_RATE_LIMIT = False  # se mide bcrypt, no el límite de intentos
+    for n in concurrency:
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            t0 = time.perf_counter()
+            ok = sum(1 for r in ex.map(lambda _: domain.auth_user(username, "pw"), range(logins)) if r)
+            elapsed = time.perf_counter() - t0
+        results.append({"rounds": BCRYPT_ROUNDS, "workers": HASH_WORKERS, "concurrency": n, "ok": ok,
+                        "seconds": round(elapsed, 4), "logins_per_s": round(logins / elapsed, 1)})
+    domain.LOGIN_RATE_LIMIT = rate_limit_before
+    return results
+
+# ---------- Async vs hilos ----------
+def bench_async_vs_threads(requests: int = 2000, concurrency=(10, 100, 1000)) -> List[dict]:
+    """
+    Compara requests/segundo de list_events con la API async y con la síncrona en un pool de hilos.
+
+    Args:
+        requests (int, optional): Llamadas por medición. Defaults to 2000.
+        concurrency (tuple, optional): Niveles de concurrencia a medir. Defaults to (10, 100, 1000).
+
+    Returns:
+        List[dict]: Una fila por (modo, concurrencia) con (seconds, req_per_s).
+    """
+    filters = {"status": "upcoming", "limit": 20}
+
+    async def run_async(n: int) -> float:
+        sem = asyncio.Semaphore(n)
+        async def one():
+            async with sem:
+                await domain_async.list_events(**filters)
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - t0
+
+    async def run_all():
+        try:
+            return [await run_async(n) for n in concurrency]
+        finally:
+            await close_async_pool()
+
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    results = []
+    for n, elapsed in zip(concurrency, asyncio.run(run_all())):
+        results.append({"mode": "async", "concurrency": n, "seconds": round(elapsed, 4), "req_per_s": round(requests / elapsed, 1)})
+    for n in concurrency:
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            t0 = time.perf_counter()
+            list(ex.map(lambda _: domain.list_events(**filters), range(requests)))
+            elapsed = time.perf_counter() - t0
+        results.append({"mode": "threads", "concurrency": n, "seconds": round(elapsed, 4), "req_per_s": round(requests / elapsed, 1)})
+    return results
+
+# ---------- Reservas ----------
+def bench_holds(n: int = 5000, workers: int = 64, seats: int = 4000) -> dict:
+    """
+    Lanza ``n`` reservas concurrentes de 1 cupo sobre un mismo evento y mide el barrido de expiradas.
+
+    Args:
+        n (int, optional): Reservas a intentar. Defaults to 5000.
+        workers (int, optional): Hilos concurrentes. Defaults to 64.
+        seats (int, optional): Cupos totales del evento. Defaults to 4000.
+
+    Returns:
+        dict: Resultado con (holds, ok, err, held, overhold, seconds, holds_per_s, released, sweep_seconds).
+    """
+    e = create_event("Bench holds", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, seats)
+    uid = create_user(f"bench_holds_{time.time_ns()}", "pw", "admin")
+    def one(_):
+        try:
+            holds.hold(e, 1, uid, ttl=1)
+            return True
+        except ValueError:
+            return False
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        t0 = time.perf_counter()
+        ok = sum(ex.map(one, range(n)))
+        elapsed = time.perf_counter() - t0
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute("SELECT seats_held FROM events WHERE id=%s", (e,))
+        held = cur.fetchone()[0]
+    time.sleep(1.1)
+    t0 = time.perf_counter()
+    released = holds.release_expired()
+    sweep = time.perf_counter() - t0
+    return {
+        "holds": n,
+        "ok": ok,
+        "err": n - ok,
+        "held": held,
+        "overhold": held > seats,
+        "seconds": round(elapsed, 4),
+        "holds_per_s": round(ok / elapsed, 1),
+        "released": released,
+        "sweep_seconds": round(sweep, 4),
+    }
+
+# ---------- HTTP ----------
+def _percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+def bench_http(requests: int = 2000, concurrency: int = 32, host: str = None, port: int = None) -> List[dict]:
+    """
+    Genera carga contra la API HTTP y mide latencia p50/p99 y requests/segundo por endpoint.
+
+    Si no se indica ``host``/``port`` se levanta server.py en un hilo de este proceso (puerto libre);
+    para medir sin que el generador compita por el GIL, iniciar ``python server.py`` aparte e indicarlo.
+
+    Args:
+        requests (int, optional): Requests por endpoint. Defaults to 2000.
+        concurrency (int, optional): Clientes concurrentes (una conexión keep-alive cada uno). Defaults to 32.
+
+    Returns:
+        List[dict]: Una fila por endpoint con (endpoint, ok, errors, p50_ms, p99_ms, req_per_s).
+    """
+    httpd = None
+    if port is None:
+        httpd = server.make_server(port=0)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        host, port = httpd.server_address
+    host = host or "127.0.0.1"
+    username = f"bench_http_{time.time_ns()}"
+    create_user(username, "pw", "admin")
+    e = create_event("Bench http", "x", datetime.now(UTC)+timedelta(days=1), "Show", 1000, requests * 2)
+    local = threading.local()
+    conns = []
+
+    def call(method: str, path: str, body: dict = None, token: str = None):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(host, port, timeout=30)
+            conns.append(conn)
+        headers = {"Content-Type": "application/json"}
+        if token: headers["Authorization"] = f"Bearer {token}"
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read() or b"null")
+
+    rate_limit_before = domain.LOGIN_RATE_LIMIT
+    domain.LOGIN_RATE_LIMIT = False  # los logins del benchmark vienen todos del mismo cliente
+    try:
+        token = call("POST", "/login", {"username": username, "password": "pw"})[1]["token"]
+        endpoints = {
+            "POST /login": lambda i: call("POST", "/login", {"username": username, "password": "pw"}),
+            "GET /events": lambda i: call("GET", "/events?status=upcoming&limit=20", token=token),
+            "GET /events/{id}": lambda i: call("GET", f"/events/{e}", token=token),
+            "POST /events/{id}/sell": lambda i: call("POST", f"/events/{e}/sell", {"qty": 1}, token=token),
+            "GET /reports/summary": lambda i: call("GET", "/reports/summary", token=token),
+        }
+        results = []
+        for name, fn in endpoints.items():
+            def timed(i):
+                t0 = time.perf_counter()
+                status, _ = fn(i)
+                return status, (time.perf_counter() - t0) * 1000
+            with ThreadPoolExecutor(max_workers=concurrency) as ex:
+                t0 = time.perf_counter()
+                rows = list(ex.map(timed, range(requests)))
+                elapsed = time.perf_counter() - t0
+            # Cada medición usa hilos nuevos: se cierran sus conexiones para liberar los workers del servidor
+            for conn in conns: conn.close()
+            conns.clear()
+            latencies = [ms for status, ms in rows]
+            ok = sum(1 for status, _ in rows if status < 400)
+            results.append({"endpoint": name, "ok": ok, "errors": requests - ok,
+                            "p50_ms": round(_percentile(latencies, 0.50), 2),
+                            "p99_ms": round(_percentile(latencies, 0.99), 2),
+                            "req_per_s": round(requests / elapsed, 1)})
+    finally:
+        domain.LOGIN_RATE_LIMIT = rate_limit_before
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+    return results
+
+# ---------- Limpieza ----------
+def cleanup():
+    """Elimina los eventos y usuarios creados por los benchmarks."""
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute("DELETE FROM events WHERE name LIKE 'Bench %'")
+        cur.execute("DELETE FROM users WHERE username LIKE 'bench\\_%'")
+
+def main():
+    """
+    Ejecuta los benchmarks y muestra los resultados por consola.
+    """
+    print("=" * 60)
+    print("BENCHMARK CONTENCIÓN (lock vs conditional)")
+    print("=" * 60)
+    mode_before = domain.SALE_MODE
+    try:
+        for mode in ("lock", "conditional"):
+            print(bench_contention(mode))
+        print("=" * 60)
+        print("EVENTO MUY DEMANDADO (conditional vs sharded)")
+        print("=" * 60)
+        for r in bench_hot_event():
+            print(r)
+        print("=" * 60)
+        print("PLANES list_events (1M eventos)")
+        print("=" * 60)
+        seed_events()
+        for name, scans in check_list_plans().items():
+            print(f"{name}: {scans}")
+        print("=" * 60)
+        print("BÚSQUEDA ILIKE VS TEXTO COMPLETO (1M eventos)")
+        print("=" * 60)
+        for r in bench_search():
+            print(r)
+        print("=" * 60)
+        print("IMPORTACIÓN MASIVA (COPY)")
+        print("=" * 60)
+        print(bench_import())
+        print("=" * 60)
+        print("LOGIN (bcrypt)")
+        print("=" * 60)
+        for r in bench_login():
+            print(r)
+        print("=" * 60)
+        print("ASYNC VS HILOS (list_events)")
+        print("=" * 60)
+        for r in bench_async_vs_threads():
+            print(r)
+        print("=" * 60)
+        print("API HTTP (p50/p99 por endpoint)")
+        print("=" * 60)
+        for r in bench_http():
+            print(r)
+        print("=" * 60)
+        print("RESERVAS (hold + barrido de expiradas)")
+        print("=" * 60)
+        print(bench_holds())
+    finally:
+        domain.SALE_MODE = mode_before
+        cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import subprocess
+from datetime import datetime, timedelta, UTC
+from typing import Callable, List
+import domain
+from db import get_conn
+from hashing import hash_password
+from reports import revenue_by
+from bench import bench_hot_event, cleanup
+
+# Fecha base fija: el mismo seed genera exactamente los mismos datos en cada corrida
+BASE_DATE = datetime(2026, 1, 1, tzinfo=UTC)
+CATEGORIES = ("Charla", "Taller", "Show", "Otro")
+WORDS = ("concierto", "taller", "charla", "festival", "teatro", "jazz", "rock", "python", "datos", "cine",
+         "danza", "ciencia", "historia", "música", "poesía", "fotografía", "cocina", "vino", "diseño", "robótica")
+
+# ---------- Datos sintéticos ----------
+def generate_dataset(events: int = 10_000, users: int = 200, movements: int = 50_000, seed: int = 42) -> dict:
+    """
+    Genera un conjunto de datos determinista (prefijo 'Bench suite ') y lo carga con COPY.
+
+    Los eventos se reparten entre categorías y 2 años de fechas desde BASE_DATE; los movimientos
+    (90% ventas) respetan los cupos de cada evento, que queda con seats_sold consistente.
+
+    Args:
+        events (int, optional): Cantidad de eventos. Defaults to 10_000.
+        users (int, optional): Cantidad de usuarios (bench_suite_<n>, contraseña "pw"). Defaults to 200.
+        movements (int, optional): Cantidad de ventas/devoluciones. Defaults to 50_000.
+        seed (int, optional): Semilla del generador. Defaults to 42.
+
+    Returns:
+        dict: Resultado con (event_ids, user_ids, seconds).
+    """
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    event_rows = []
+    for i in range(events):
+        name = f"Bench suite {i} {rng.choice(WORDS)} {rng.choice(WORDS)}"
+        description = " ".join(rng.choice(WORDS) for _ in range(8))
+        starts_at = BASE_DATE + timedelta(minutes=rng.randrange(730 * 1440))
+        event_rows.append([name, description, starts_at, rng.choice(CATEGORIES), rng.randrange(0, 50) * 1000,
+                           rng.choice((50, 100, 200, 500, 1000)), 0])
+    pwd = hash_password("pw")  # un solo hash: bcrypt por usuario dominaría el tiempo de carga
+    with get_conn() as c, c.cursor() as cur:
+        with cur.copy("COPY users(username,password_hash,role) FROM STDIN") as copy:
+            for i in range(users):
+                copy.write_row((f"bench_suite_{seed}_{i}", pwd, "admin" if i % 10 == 0 else "viewer"))
+        cur.execute("SELECT id FROM users WHERE username LIKE %s ORDER BY id", (f"bench\\_suite\\_{seed}\\_%",))
+        user_ids = [r[0] for r in cur.fetchall()]
+
+    movement_rows = []
+    sold = [0] * events
+    for _ in range(movements):
+        i = rng.randrange(events)
+        seats_total = event_rows[i][5]
+        if sold[i] and rng.random() < 0.1:
+            mtype, qty = "REFUND", rng.randint(1, min(4, sold[i]))
+            sold[i] -= qty
+        elif sold[i] < seats_total:
+            mtype, qty = "SALE", rng.randint(1, min(4, seats_total - sold[i]))
+            sold[i] += qty
+        else:
+            continue
+        created_at = event_rows[i][2] - timedelta(minutes=rng.randrange(1, 60 * 24 * 30))
+        movement_rows.append((i, mtype, qty, rng.choice(user_ids), created_at))
+    for i, row in enumerate(event_rows):
+        row[6] = sold[i]
+
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM events")
+        last_id = cur.fetchone()[0]
+        with cur.copy("COPY events(name,description,starts_at,category,price,seats_total,seats_sold) FROM STDIN") as copy:
+            for row in event_rows:
+                copy.write_row(row)
+        cur.execute("SELECT id FROM events WHERE name LIKE 'Bench suite %%' AND id > %s ORDER BY id", (last_id,))
+        event_ids = [r[0] for r in cur.fetchall()]
+        with cur.copy("COPY movements(event_id,type,qty,user_id,created_at) FROM STDIN") as copy:
+            for i, mtype, qty, user_id, created_at in movement_rows:
+                copy.write_row((event_ids[i], mtype, qty, user_id, created_at))
+        cur.execute("ANALYZE events")
+        cur.execute("ANALYZE movements")
+    return {"event_ids": event_ids, "user_ids": user_ids, "seconds": round(time.perf_counter() - t0, 2)}
+
+# ---------- Medición ----------
+def _percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+def measure(fn: Callable[[int], object], calls: int, setup: Callable[[int], object] = None, warmup: int = 5) -> dict:
+    """
+    Ejecuta ``fn(i)`` ``calls`` veces y resume su latencia.
+
+    Args:
+        fn (Callable[[int], object]): Función a medir; recibe el número de llamada.
+        calls (int): Llamadas medidas.
+        setup (Callable[[int], object], optional): Preparación antes de cada llamada, fuera del tiempo medido.
+        warmup (int, optional): Llamadas previas no medidas. Defaults to 5.
+
+    Returns:
+        dict: Resultado con (calls, mean_ms, p50_ms, p99_ms, ops_per_s).
+    """
+    for i in range(warmup):
+        if setup: setup(i)
+        fn(i)
+    latencies = []
+    for i in range(calls):
+        if setup: setup(i)
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    total = sum(latencies)
+    return {
+        "calls": calls,
+        "mean_ms": round(total / calls, 3),
+        "p50_ms": round(_percentile(latencies, 0.50), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "ops_per_s": round(calls / (total / 1000), 1) if total else 0.0,
+    }
+
+def micro_benchmarks(dataset: dict, calls: int = 500, seed: int = 42) -> dict:
+    """
+    Micro-benchmarks de las funciones del dominio sobre el conjunto generado.
+
+    Returns:
+        dict: Resultado de measure() por nombre de benchmark.
+    """
+    rng = random.Random(seed)
+    event_ids, user_ids = dataset["event_ids"], dataset["user_ids"]
+    picks = [rng.choice(event_ids) for _ in range(calls + 5)]
+    uid = user_ids[0]
+    username = f"bench_suite_{seed}_0"
+    micro = domain.create_event("Bench suite micro", "x", BASE_DATE, "Show", 1000, 1_000_000)
+    days = [BASE_DATE + timedelta(days=rng.randrange(730)) for _ in range(calls + 5)]
+    results = {
+        "get_event.miss": measure(lambda i: domain.get_event(picks[i]), calls, setup=lambda i: domain._event_cache.clear()),
+        "get_event.hit": measure(lambda i: domain.get_event(picks[0]), calls),
+        "list_events.page": measure(lambda i: domain.list_events(limit=20), calls),
+        "list_events.category_range": measure(
+            lambda i: domain.list_events(category=CATEGORIES[i % 4], dt_from=days[i], dt_to=days[i] + timedelta(days=7), limit=20), calls),
+        "list_events.q": measure(lambda i: domain.list_events(q=WORDS[i % len(WORDS)], limit=20), calls),
+        "list_events.soldout": measure(lambda i: domain.list_events(status="soldout", limit=20), calls),
+        "report_summary": measure(lambda i: domain.report_summary(), calls),
+        "revenue_by.category": measure(lambda i: revenue_by("category"), max(calls // 10, 10)),
+        "sell": measure(lambda i: domain.sell(micro, 1, uid), calls),
+        "refund": measure(lambda i: domain.refund(micro, 1, uid), calls),
+        "create_event": measure(lambda i: domain.create_event(f"Bench suite new {i}", "x", BASE_DATE, "Otro", 0, 10), calls),
+    }
+    rate_limit_before = domain.LOGIN_RATE_LIMIT
+    domain.LOGIN_RATE_LIMIT = False
+    try:
+        results["auth_user"] = measure(lambda i: domain.auth_user(username, "pw"), max(calls // 25, 10), warmup=1)
+    finally:
+        domain.LOGIN_RATE_LIMIT = rate_limit_before
+    return results
+
+def concurrency_benchmarks(sales: int = 2000) -> dict:
+    """
+    Ventas concurrentes sobre un evento muy demandado (bench.bench_hot_event).
+
+    Returns:
+        dict: Resultado por ``hot_event.<modo>.<hilos>`` con (workers, ok, sales_per_s).
+    """
+    mode_before = domain.SALE_MODE
+    try:
+        rows = bench_hot_event(sales=sales)
+    finally:
+        domain.SALE_MODE = mode_before
+    return {f"hot_event.{r['mode']}.{r['workers']}": {"workers": r["workers"], "ok": r["ok"], "sales_per_s": r["sales_per_s"]}
+            for r in rows}
+
+# ---------- Resultados ----------
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run_suite(events: int = 10_000, users: int = 200, movements: int = 50_000, seed: int = 42,
+              calls: int = 500, sales: int = 2000) -> dict:
+    """
+    Genera los datos, ejecuta todos los benchmarks y limpia los datos generados.
+
+    Returns:
+        dict: Resultados con (meta, results), listos para write_results.
+    """
+    try:
+        dataset = generate_dataset(events, users, movements, seed)
+        results = micro_benchmarks(dataset, calls, seed)
+        results.update(concurrency_benchmarks(sales))
+    finally:
+        cleanup()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sale_mode": domain.SALE_MODE,
+            "params": {"events": events, "users": users, "movements": movements, "seed": seed, "calls": calls, "sales": sales},
+            "generate_seconds": dataset["seconds"],
+        },
+        "results": results,
+    }
+
+def write_results(data: dict, path: str) -> None:
+    """Escribe los resultados como JSON con claves ordenadas (diff estable entre corridas)."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+def compare(old: dict, new: dict, threshold: float = 0.15) -> List[dict]:
+    """
+    Compara dos corridas y marca las regresiones.
+
+    Se compara p50_ms (más es peor) o, en los benchmarks de concurrencia, sales_per_s (menos es peor).
+
+    Args:
+        old (dict): Resultados base.
+        new (dict): Resultados nuevos.
+        threshold (float, optional): Variación relativa tolerada. Defaults to 0.15.
+
+    Returns:
+        List[dict]: Una fila por benchmark común con (name, metric, old, new, change, regression).
+    """
+    rows = []
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        a, b = old["results"][name], new["results"][name]
+        metric, worse = ("p50_ms", 1) if "p50_ms" in a else ("sales_per_s", -1)
+        if not a.get(metric):
+            continue
+        change = (b[metric] - a[metric]) / a[metric]
+        rows.append({"name": name, "metric": metric, "old": a[metric], "new": b[metric],
+                     "change": round(change, 4), "regression": change * worse > threshold})
+    return rows
+
+def main():
+    """
+    ``python benchsuite.py run [--out archivo.json]`` o ``python benchsuite.py compare base.json nuevo.json``.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks del dominio")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Ejecuta la suite y guarda los resultados")
+    run.add_argument("--out", default="bench_results.json")
+    run.add_argument("--events", type=int, default=10_000)
+    run.add_argument("--users", type=int, default=200)
+    run.add_argument("--movements", type=int, default=50_000)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--calls", type=int, default=500)
+    run.add_argument("--sales", type=int, default=2000)
+    cmp = sub.add_parser("compare", help="Compara dos archivos de resultados")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        data = run_suite(args.events, args.users, args.movements, args.seed, args.calls, args.sales)
+        write_results(data, args.out)
+        for name, r in sorted(data["results"].items()):
+            print(f"{name:32} {r}")
+        print(f"Resultados en {args.out}")
+        return
+    with open(args.base, encoding="utf-8") as f: old = json.load(f)
+    with open(args.new, encoding="utf-8") as f: new = json.load(f)
+    rows = compare(old, new, args.threshold)
+    for r in rows:
+        flag = "REGRESIÓN" if r["regression"] else ""
+        print(f"{r['name']:32} {r['metric']:12} {r['old']:>10} -> {r['new']:>10} ({r['change']:+.1%}) {flag}")
+    if any(r["regression"] for r in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class LRUCache:
+    """
+    Caché en memoria con política LRU, expiración por TTL y contadores de uso.
+
+    Attributes:
+        maxsize (int): Máximo de entradas; 0 desactiva la caché.
+        ttl (float): Segundos de vida de cada entrada.
+        hits (int): Lecturas servidas desde la caché.
+        misses (int): Lecturas no encontradas o expiradas.
+        evictions (int): Entradas descartadas por tamaño o expiración.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Reloj lógico de invalidaciones: última invalidación por clave (acotado a maxsize claves);
+        # _floor es la marca más alta de las claves ya olvidadas
+        self._clock = 0
+        self._invalidated = OrderedDict()
+        self._floor = 0
+
+    def get(self, key, default=None):
+        """
+        Obtiene el valor asociado a ``key`` si existe y no ha expirado.
+
+        Returns:
+            El valor cacheado o ``default``.
+        """
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def version(self) -> int:
+        """
+        Marca del reloj de invalidaciones, a tomar antes de leer el valor que luego se pasará a set.
+
+        Returns:
+            int: Marca para el argumento ``since`` de set.
+        """
+        with self._lock:
+            return self._clock
+
+    def set(self, key, value, since: int = None) -> None:
+        """
+        Guarda ``value`` bajo ``key``, descartando la entrada menos usada si se supera maxsize.
+
+        Con ``since`` (marca de version() tomada antes de leer ``value``) no se guarda nada si
+        ``key`` se invalidó después, porque ``value`` podría ser anterior a esa escritura.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if since is not None and (since < self._floor or self._invalidated.get(key, 0) > since):
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys) -> None:
+        """Elimina las entradas indicadas, si existen."""
+        with self._lock:
+            self._clock += 1
+            for key in keys:
+                self._data.pop(key, None)
+                self._invalidated[key] = self._clock
+                self._invalidated.move_to_end(key)
+            while len(self._invalidated) > max(self.maxsize, 1):
+                _, self._floor = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Retorna los contadores de la caché.
+
+        Returns:
+            dict: Diccionario con (size, maxsize, hits, misses, evictions).
+        """
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -27,3 +27,191 @@ CREATE TABLE IF NOT EXISTS movements (
   user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE RESTRICT,
   created_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+
+-- Índices para los filtros de list_events
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS events_starts_at_idx ON events (starts_at);
+CREATE INDEX IF NOT EXISTS events_category_starts_at_idx ON events (category, starts_at);
+CREATE INDEX IF NOT EXISTS events_name_trgm_idx ON events USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS events_description_trgm_idx ON events USING gin (description gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS events_soldout_idx ON events (starts_at) WHERE (seats_total - seats_sold) = 0;
+
+-- Resumen de eventos (report_summary en O(1)). Los triggers no actualizan filas compartidas:
+-- cada sentencia sobre events agrega sus cambios y los anota como una fila nueva en
+-- events_summary_delta, sin bloqueos que se mantengan hasta el commit. domain.compact_summary
+-- pliega periódicamente los deltas en la única fila de events_summary.
+CREATE TABLE IF NOT EXISTS events_summary (
+  id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+  total_events BIGINT NOT NULL DEFAULT 0,
+  sum_available BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO events_summary(id, total_events, sum_available)
+SELECT true, COUNT(*), COALESCE(SUM(seats_total - seats_sold), 0) FROM events
+ON CONFLICT (id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS events_summary_delta (
+  id BIGSERIAL PRIMARY KEY,
+  total_events BIGINT NOT NULL,
+  sum_available BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION events_summary_trg() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO events_summary_delta(total_events, sum_available)
+    SELECT COUNT(*), SUM(seats_total - seats_sold) FROM new_rows HAVING COUNT(*) > 0;
+  ELSIF TG_OP = 'DELETE' THEN
+    INSERT INTO events_summary_delta(total_events, sum_available)
+    SELECT -COUNT(*), -SUM(seats_total - seats_sold) FROM old_rows HAVING COUNT(*) > 0;
+  ELSE
+    INSERT INTO events_summary_delta(total_events, sum_available)
+    SELECT 0, d.avail
+      FROM (SELECT (SELECT COALESCE(SUM(seats_total - seats_sold), 0) FROM new_rows)
+                 - (SELECT COALESCE(SUM(seats_total - seats_sold), 0) FROM old_rows) AS avail) d
+     WHERE d.avail <> 0;
+  END IF;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_summary_ins_trg
+AFTER INSERT ON events REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_summary_trg();
+
+CREATE OR REPLACE TRIGGER events_summary_upd_trg
+AFTER UPDATE ON events REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_summary_trg();
+
+CREATE OR REPLACE TRIGGER events_summary_del_trg
+AFTER DELETE ON events REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION events_summary_trg();
+
+-- Rollup horario de ventas/devoluciones (reports.py), mantenido por trigger sobre movements.
+-- Cada hora de un evento se reparte en 16 slots (movements.id % 16) para que las ventas
+-- concurrentes de un evento muy demandado no compitan por una sola fila.
+CREATE TABLE IF NOT EXISTS sales_rollup_hourly (
+  event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+  hour TIMESTAMPTZ NOT NULL,
+  tickets_sold BIGINT NOT NULL DEFAULT 0,
+  tickets_refunded BIGINT NOT NULL DEFAULT 0,
+  gross_amount BIGINT NOT NULL DEFAULT 0,
+  refunded_amount BIGINT NOT NULL DEFAULT 0,
+  slot SMALLINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (event_id, hour, slot)
+);
+CREATE INDEX IF NOT EXISTS sales_rollup_hourly_hour_idx ON sales_rollup_hourly (hour);
+
+INSERT INTO sales_rollup_hourly(event_id, hour, tickets_sold, tickets_refunded, gross_amount, refunded_amount)
+SELECT m.event_id, date_trunc('hour', m.created_at, 'UTC'),
+       COALESCE(SUM(m.qty) FILTER (WHERE m.type = 'SALE'), 0),
+       COALESCE(SUM(m.qty) FILTER (WHERE m.type = 'REFUND'), 0),
+       COALESCE(SUM(m.qty::bigint * e.price) FILTER (WHERE m.type = 'SALE'), 0),
+       COALESCE(SUM(m.qty::bigint * e.price) FILTER (WHERE m.type = 'REFUND'), 0)
+FROM movements m JOIN events e ON e.id = m.event_id
+WHERE NOT EXISTS (SELECT 1 FROM sales_rollup_hourly)
+GROUP BY 1, 2;
+
+CREATE OR REPLACE FUNCTION sales_rollup_trg() RETURNS trigger AS $$
+DECLARE
+  p INTEGER;
+BEGIN
+  SELECT price INTO p FROM events WHERE id = NEW.event_id;
+  INSERT INTO sales_rollup_hourly AS r (event_id, hour, slot, tickets_sold, tickets_refunded, gross_amount, refunded_amount)
+  VALUES (
+    NEW.event_id, date_trunc('hour', NEW.created_at, 'UTC'), NEW.id % 16,
+    CASE WHEN NEW.type = 'SALE' THEN NEW.qty ELSE 0 END,
+    CASE WHEN NEW.type = 'REFUND' THEN NEW.qty ELSE 0 END,
+    CASE WHEN NEW.type = 'SALE' THEN NEW.qty::bigint * p ELSE 0 END,
+    CASE WHEN NEW.type = 'REFUND' THEN NEW.qty::bigint * p ELSE 0 END
+  )
+  ON CONFLICT (event_id, hour, slot) DO UPDATE SET
+    tickets_sold = r.tickets_sold + EXCLUDED.tickets_sold,
+    tickets_refunded = r.tickets_refunded + EXCLUDED.tickets_refunded,
+    gross_amount = r.gross_amount + EXCLUDED.gross_amount,
+    refunded_amount = r.refunded_amount + EXCLUDED.refunded_amount;
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER sales_rollup_trg
+AFTER INSERT ON movements
+FOR EACH ROW EXECUTE FUNCTION sales_rollup_trg();
+
+-- Sesiones autenticadas (sessions.py con SESSION_STORE=db)
+CREATE TABLE IF NOT EXISTS sessions (
+  id TEXT PRIMARY KEY,
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  username VARCHAR(80) NOT NULL,
+  role TEXT NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_expires_at_idx ON sessions (expires_at);
+
+-- Reservas temporales de cupos (holds.py). seats_held se mantiene junto con cada reserva,
+-- así la disponibilidad (seats_total - seats_sold - seats_held) no requiere recorrer holds.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS seats_held INTEGER NOT NULL DEFAULT 0 CHECK (seats_held >= 0);
+
+CREATE TABLE IF NOT EXISTS holds (
+  id SERIAL PRIMARY KEY,
+  event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  qty INTEGER NOT NULL CHECK (qty > 0),
+  expires_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS holds_expires_at_idx ON holds (expires_at);
+CREATE INDEX IF NOT EXISTS holds_event_id_idx ON holds (event_id);
+
+-- Contadores de cupos repartidos (SALE_MODE=sharded). seats_sharded son los cupos del evento
+-- asignados a sus shards (libres + vendidos aún sin consolidar); la fila de events conserva
+-- el resto, así las ventas de un evento muy demandado se reparten entre varias filas.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS seats_sharded INTEGER NOT NULL DEFAULT 0 CHECK (seats_sharded >= 0);
+
+CREATE TABLE IF NOT EXISTS event_seat_shards (
+  event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+  shard SMALLINT NOT NULL,
+  seats_free INTEGER NOT NULL CHECK (seats_free >= 0),
+  seats_sold INTEGER NOT NULL DEFAULT 0 CHECK (seats_sold >= 0),
+  PRIMARY KEY (event_id, shard)
+);
+
+-- Claves de idempotencia de sell/refund. Se conservan IDEMPOTENCY_RETENTION_DAYS días
+-- (domain.purge_idempotency_keys); el índice parcial por created_at acota ese barrido.
+ALTER TABLE movements ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS movements_idempotency_key_idx ON movements (idempotency_key) WHERE idempotency_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS movements_idempotency_created_at_idx ON movements (created_at) WHERE idempotency_key IS NOT NULL;
+
+-- Búsqueda de texto completo (domain.search_events). es_unaccent es la configuración spanish
+-- con unaccent antes del stemming; search_vector solo se recalcula si cambian name o description.
+CREATE EXTENSION IF NOT EXISTS unaccent;
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+    CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+    ALTER TEXT SEARCH CONFIGURATION es_unaccent
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+  END IF;
+END
+$$;
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION events_search_vector_trg() RETURNS trigger AS $$
+BEGIN
+  NEW.search_vector := setweight(to_tsvector('es_unaccent', coalesce(NEW.name, '')), 'A')
+                    || setweight(to_tsvector('es_unaccent', coalesce(NEW.description, '')), 'B');
+  RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER events_search_vector_trg
+BEFORE INSERT OR UPDATE OF name, description ON events
+FOR EACH ROW EXECUTE FUNCTION events_search_vector_trg();
+
+UPDATE events
+   SET search_vector = setweight(to_tsvector('es_unaccent', coalesce(name, '')), 'A')
+                    || setweight(to_tsvector('es_unaccent', coalesce(description, '')), 'B')
+ WHERE search_vector IS NULL;
+CREATE INDEX IF NOT EXISTS events_search_vector_idx ON events USING gin (search_vector);
@@ -1,8 +1,49 @@
-import bcrypt
+import os
+import re
+import time
+import threading
+import weakref
+import psycopg
+from functools import lru_cache
 from datetime import datetime
-from typing import Optional, List, Tuple
-from db import get_conn
-from logger import log_user_operation, log_event_operation, log_sale_operation
+from typing import Optional, List, Tuple, Iterator
+from db import get_conn, retry_transaction
+from metrics import instrument
+from cache import LRUCache
+from hashing import hash_password, check_password
+from ratelimit import TokenBucketLimiter, LoginThrottled
+from logger import log_operation, log_user_operation, log_event_operation, log_sale_operation
+
+# Modo de venta/devolución: "lock" (SELECT ... FOR UPDATE), "conditional" (UPDATE condicional en una sentencia)
+# o "sharded" (contadores repartidos en event_seat_shards para eventos marcados con shard_event)
+SALE_MODE = os.getenv("SALE_MODE", "lock")
+SHARDS_MAX = 64
+
+# Días que se conservan las claves de idempotencia de ventas/devoluciones
+IDEMPOTENCY_RETENTION_DAYS = int(os.getenv("IDEMPOTENCY_RETENTION_DAYS", "7"))
+_idempotency_stats = {"replays": 0}
+_idempotency_lock = threading.Lock()
+
+# Reservas expiradas que una venta sin cupos libera (por evento) antes de reintentar; ver holds
+HOLD_SWEEP_BATCH = int(os.getenv("HOLD_SWEEP_BATCH", "1000"))
+
+# Caché de get_event; se invalida en cada escritura de este proceso y expira tras EVENT_CACHE_TTL segundos
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", "1024"))
+EVENT_CACHE_TTL = float(os.getenv("EVENT_CACHE_TTL", "30"))
+_event_cache = LRUCache(EVENT_CACHE_SIZE, EVENT_CACHE_TTL)
+
+# Segundos entre compactaciones de events_summary_delta (start_summary_compactor)
+SUMMARY_COMPACT_INTERVAL = float(os.getenv("SUMMARY_COMPACT_INTERVAL", "10"))
+
+# Sentencias de list_events ya preparadas en cada conexión del pool (solo para instrumentación)
+_prepared_by_conn = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+_prepare_stats = {"hits": 0, "prepares": 0}
+
+# Límite de intentos de login (token bucket) por usuario y por cliente; 0 en LOGIN_RATE_LIMIT lo desactiva
+LOGIN_RATE_LIMIT = os.getenv("LOGIN_RATE_LIMIT", "1") == "1"
+_login_user_limiter = TokenBucketLimiter(float(os.getenv("LOGIN_USER_RATE", "10")), int(os.getenv("LOGIN_USER_BURST", "5")))
+_login_client_limiter = TokenBucketLimiter(float(os.getenv("LOGIN_CLIENT_RATE", "60")), int(os.getenv("LOGIN_CLIENT_BURST", "20")))
 
 # ---------- Usuarios ----------
 def create_user(username: str, password: str, role: str = "admin") -> int:
@@ -22,44 +63,124 @@ def create_user(username: str, password: str, role: str = "admin") -> int:
     """
     if role not in ("admin", "viewer"):
         raise ValueError("Rol inválido")
-    pwd = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
     with get_conn() as c, c.cursor() as cur:
         cur.execute("SELECT 1 FROM users WHERE username=%s", (username,))
         if cur.fetchone():
             raise ValueError("Usuario ya existe")
-        cur.execute(
-            "INSERT INTO users(username,password_hash,role) VALUES(%s,%s,%s) RETURNING id",
-            (username, pwd, role),
-        )
-        user_id = cur.fetchone()[0]
-        log_user_operation(user_id, username, "CREATE", f"role={role}")
-        return user_id
+    # El hash se calcula sin conexión tomada; la restricción UNIQUE cubre la carrera entre ambos pasos
+    pwd = hash_password(password)
+    try:
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute(
+                "INSERT INTO users(username,password_hash,role) VALUES(%s,%s,%s) RETURNING id",
+                (username, pwd, role),
+            )
+            user_id = cur.fetchone()[0]
+    except psycopg.errors.UniqueViolation:
+        raise ValueError("Usuario ya existe")
+    log_user_operation(user_id, username, "CREATE", f"role={role}")
+    return user_id
 
-def auth_user(username: str, password: str) -> Optional[Tuple[int,str]]:
+_AUTH_SQL = "SELECT id, password_hash, role FROM users WHERE username=%s"
+
+@instrument
+def auth_user(username: str, password: str, client: str = "") -> Optional[Tuple[int,str]]:
     """
     Autentica un usuario con sus credenciales.
     
     Args:
         username (str): Nombre de usuario.
         password (str): Contraseña en texto plano.
+        client (str, optional): Identificador del cliente (p. ej. IP) para el límite de intentos.
         
     Returns:
         Optional[Tuple[int,str]]: Tupla con (user_id, role) si la autenticación es exitosa, None en caso contrario.
+        
+    Raises:
+        LoginThrottled: Si el usuario o el cliente excedieron el límite de intentos.
     """
+    _check_login_rate(username, client)
     with get_conn() as c, c.cursor() as cur:
-        cur.execute("SELECT id, password_hash, role FROM users WHERE username=%s", (username,))
+        cur.execute(_AUTH_SQL, (username,))
         row = cur.fetchone()
-        if not row: 
-            log_user_operation(0, username, "AUTH_FAILED", "user_not_found")
-            return None
-        uid, ph, role = row
-        if bcrypt.checkpw(password.encode(), ph.encode()):
-            log_user_operation(uid, username, "AUTH_SUCCESS", f"role={role}")
-            return uid, role
-        log_user_operation(uid, username, "AUTH_FAILED", "invalid_password")
+    return _check_credentials(username, password, row)
+
+def _check_credentials(username: str, password: str, row: Optional[tuple]) -> Optional[Tuple[int,str]]:
+    """
+    Verifica la contraseña contra la fila (id, password_hash, role) del usuario en el pool de hashing y registra el resultado.
+    
+    Returns:
+        Optional[Tuple[int,str]]: (user_id, role) si la contraseña es válida, None en caso contrario.
+    """
+    if not row:
+        return _auth_result(username, None, False)
+    return _auth_result(username, row, check_password(password, row[1]))
+
+def _check_login_rate(username: str, client: str = "") -> None:
+    """
+    Consume un intento de login del usuario y del cliente antes de cualquier consulta o bcrypt.
+    
+    Raises:
+        LoginThrottled: Si alguno de los dos buckets está vacío.
+    """
+    if not LOGIN_RATE_LIMIT:
+        return
+    if not _login_user_limiter.allow(username) or (client and not _login_client_limiter.allow(client)):
+        log_user_operation(0, username, "AUTH_THROTTLED", f"client={client}")
+        raise LoginThrottled("Demasiados intentos, intente más tarde")
+
+def login_rate_stats() -> dict:
+    """
+    Retorna los contadores de los límites de login.
+    
+    Returns:
+        dict: Diccionario con los stats (keys, allowed, throttled) por usuario y por cliente.
+    """
+    return {"user": _login_user_limiter.stats(), "client": _login_client_limiter.stats()}
+
+def _auth_result(username: str, row: Optional[tuple], valid: bool) -> Optional[Tuple[int,str]]:
+    """
+    Registra el resultado de una autenticación ya verificada.
+    
+    Returns:
+        Optional[Tuple[int,str]]: (user_id, role) si ``valid``, None en caso contrario.
+    """
+    if not row: 
+        log_user_operation(0, username, "AUTH_FAILED", "user_not_found")
         return None
+    uid, ph, role = row
+    if valid:
+        _login_user_limiter.reset(username)
+        log_user_operation(uid, username, "AUTH_SUCCESS", f"role={role}")
+        return uid, role
+    log_user_operation(uid, username, "AUTH_FAILED", "invalid_password")
+    return None
 
 # ---------- Eventos ----------
+EVENT_CATEGORIES = ("Charla", "Taller", "Show", "Otro")
+
+def validate_event(category: str, price: int, seats_total: int) -> None:
+    """
+    Valida las reglas de negocio de un evento antes de persistirlo.
+    
+    Args:
+        category (str): Categoría del evento.
+        price (int): Precio de la entrada en CLP.
+        seats_total (int): Total de cupos disponibles.
+        
+    Raises:
+        ValueError: Si la categoría es inválida o los valores son negativos.
+    """
+    if category not in EVENT_CATEGORIES:
+        raise ValueError("Categoría inválida")
+    if price < 0 or seats_total < 0:
+        raise ValueError("Valores no válidos")
+
+_CREATE_EVENT_SQL = """INSERT INTO events(name,description,starts_at,category,price,seats_total,seats_sold)
+                        VALUES(%s,%s,%s,%s,%s,%s,0) RETURNING id"""
+
+@instrument
+@retry_transaction
 def create_event(name: str, description: str, starts_at: datetime, category: str, price: int, seats_total: int) -> int:
     """
     Crea un nuevo evento en el sistema.
@@ -76,20 +197,17 @@ def create_event(name: str, description: str, starts_at: datetime, category: str
         int: ID del evento creado.
         
     Raises:
-        ValueError: Si los valores son negativos.
+        ValueError: Si la categoría es inválida o los valores son negativos.
     """
-    if price < 0 or seats_total < 0:
-        raise ValueError("Valores no válidos")
+    validate_event(category, price, seats_total)
     with get_conn() as c, c.cursor() as cur:
-        cur.execute(
-            """INSERT INTO events(name,description,starts_at,category,price,seats_total,seats_sold)
-               VALUES(%s,%s,%s,%s,%s,%s,0) RETURNING id""",
-            (name.strip(), description.strip(), starts_at, category, price, seats_total),
-        )
+        cur.execute(_CREATE_EVENT_SQL, (name.strip(), description.strip(), starts_at, category, price, seats_total))
         event_id = cur.fetchone()[0]
-        log_event_operation(event_id, "CREATE", f"name={name}, category={category}, price={price}, seats_total={seats_total}")
-        return event_id
+    log_event_operation(event_id, "CREATE", name=name, category=category, price=price, seats_total=seats_total)
+    return event_id
 
+@instrument
+@retry_transaction
 def update_event(event_id: int, **fields) -> None:
     """
     Actualiza los campos de un evento existente.
@@ -99,21 +217,29 @@ def update_event(event_id: int, **fields) -> None:
         **fields: Campos a actualizar (name, description, starts_at, category, price, seats_total).
         
     Raises:
-        ValueError: Si el evento no existe o si seats_total es menor que seats_sold.
+        ValueError: Si el evento no existe o si seats_total es menor que los cupos vendidos y reservados.
+        
+    Note:
+        Las reservas expiradas del evento se liberan antes de rechazar un seats_total menor.
     """
-    if "seats_total" in fields:
-        new_total = int(fields["seats_total"])
-        with get_conn() as c, c.cursor() as cur:
-            cur.execute("SELECT seats_sold FROM events WHERE id=%s", (event_id,))
-            row = cur.fetchone()
-            if not row: raise ValueError("Evento no existe")
-            if new_total < row[0]: raise ValueError("Cupos totales no pueden ser < vendidos")
     sets = ", ".join(f"{k}=%s" for k in fields.keys())
     vals = list(fields.values()) + [event_id]
     with get_conn() as c, c.cursor() as cur:
+        if "seats_total" in fields:
+            new_total = int(fields["seats_total"])
+            for attempt in range(2):
+                cur.execute("SELECT seats_sold + seats_held + seats_sharded FROM events WHERE id=%s FOR UPDATE", (event_id,))
+                row = cur.fetchone()
+                if not row: raise ValueError("Evento no existe")
+                if new_total >= row[0] or attempt or not _release_expired(cur, HOLD_SWEEP_BATCH, [event_id]):
+                    break
+            if new_total < row[0]: raise ValueError("Cupos totales no pueden ser < vendidos")
         cur.execute(f"UPDATE events SET {sets}, updated_at=now() WHERE id=%s", vals)
-        log_event_operation(event_id, "UPDATE", f"fields={list(fields.keys())}")
+    _event_cache.invalidate(event_id)
+    log_event_operation(event_id, "UPDATE", fields=list(fields))
 
+@instrument
+@retry_transaction
 def delete_event(event_id: int) -> None:
     """
     Elimina un evento del sistema.
@@ -127,10 +253,13 @@ def delete_event(event_id: int) -> None:
     with get_conn() as c, c.cursor() as cur:
         cur.execute("DELETE FROM events WHERE id=%s", (event_id,))
         if cur.rowcount == 0: raise ValueError("Evento no existe")
-        log_event_operation(event_id, "DELETE", "")
+    _event_cache.invalidate(event_id)
+    log_event_operation(event_id, "DELETE", "")
 
 # ---------- Ventas/Devoluciones ----------
-def sell(event_id: int, qty: int, user_id: int) -> None:
+@instrument
+@retry_transaction
+def sell(event_id: int, qty: int, user_id: int, idempotency_key: str = None) -> None:
     """
     Vende entradas para un evento.
     
@@ -138,24 +267,67 @@ def sell(event_id: int, qty: int, user_id: int) -> None:
         event_id (int): ID del evento.
         qty (int): Cantidad de entradas a vender.
         user_id (int): ID del usuario que realiza la venta.
+        idempotency_key (str, optional): Clave del cliente; un reintento con la misma clave no vuelve a vender.
         
     Raises:
-        ValueError: Si la cantidad es inválida, el evento no existe o no hay cupos suficientes.
+        ValueError: Si la cantidad es inválida, el evento no existe, no hay cupos suficientes
+            o la clave ya se usó en otra operación.
     """
-    if qty <= 0: raise ValueError("Cantidad debe ser > 0")
+    _idempotent(event_id, qty, user_id, "SALE", idempotency_key)
+
+@instrument
+@retry_transaction
+def sell_many(items: List[Tuple[int,int]], user_id: int) -> None:
+    """
+    Vende entradas de varios eventos en una sola transacción (todo o nada).
+    
+    Args:
+        items (List[Tuple[int,int]]): Líneas del carrito como (event_id, qty).
+        user_id (int): ID del usuario que realiza la venta.
+        
+    Raises:
+        ValueError: Si el carrito está vacío, alguna cantidad es inválida, algún evento no existe o no hay cupos suficientes.
+        
+    Note:
+        Las filas se bloquean en orden de ID para evitar deadlocks entre carritos concurrentes. Si a algún
+        evento le faltan cupos, se liberan primero sus reservas expiradas y se reintenta una vez.
+    """
+    if not items: raise ValueError("Carrito vacío")
+    t0 = time.perf_counter()
+    totals = {}
+    for event_id, qty in items:
+        if qty <= 0: raise ValueError("Cantidad debe ser > 0")
+        totals[event_id] = totals.get(event_id, 0) + qty
+    ids = sorted(totals)
+    qtys = [totals[i] for i in ids]
     with get_conn() as c, c.cursor() as cur:
-        cur.execute("SELECT seats_total, seats_sold FROM events WHERE id=%s FOR UPDATE", (event_id,))
-        row = cur.fetchone()
-        if not row: raise ValueError("Evento no existe")
-        total, sold = row
-        available = total - sold
-        if available < qty: raise ValueError("No hay cupos suficientes")
-        cur.execute("UPDATE events SET seats_sold = seats_sold + %s, updated_at=now() WHERE id=%s", (qty, event_id))
-        cur.execute("INSERT INTO movements(event_id,type,qty,user_id) VALUES(%s,'SALE',%s,%s)",
-                    (event_id, qty, user_id))
-        log_sale_operation(event_id, user_id, qty, "SALE")
+        for attempt in range(2):
+            cur.execute(
+                "SELECT id, seats_total - seats_sold - seats_held - seats_sharded FROM events WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+                (ids,),
+            )
+            available = dict(cur.fetchall())
+            short = [i for i in ids if i in available and available[i] < totals[i]]
+            if not short or attempt or not _release_expired(cur, HOLD_SWEEP_BATCH, short):
+                break
+        for event_id in ids:
+            if event_id not in available: raise ValueError(f"Evento {event_id} no existe")
+            if available[event_id] < totals[event_id]: raise ValueError(f"No hay cupos suficientes en evento {event_id}")
+        cur.execute(
+            """UPDATE events e SET seats_sold = e.seats_sold + c.qty, updated_at=now()
+               FROM unnest(%s::int[], %s::int[]) AS c(id, qty) WHERE e.id = c.id""",
+            (ids, qtys),
+        )
+        cur.executemany("INSERT INTO movements(event_id,type,qty,user_id) VALUES(%s,'SALE',%s,%s)",
+                        [(event_id, qty, user_id) for event_id, qty in items])
+    _event_cache.invalidate(*ids)
+    latency_ms = _ms_since(t0)
+    for event_id, qty in items:
+        log_sale_operation(event_id, user_id, qty, "SALE", latency_ms)
 
-def refund(event_id: int, qty: int, user_id: int) -> None:
+@instrument
+@retry_transaction
+def refund(event_id: int, qty: int, user_id: int, idempotency_key: str = None) -> None:
     """
     Devuelve entradas de un evento.
     
@@ -163,56 +335,618 @@ def refund(event_id: int, qty: int, user_id: int) -> None:
         event_id (int): ID del evento.
         qty (int): Cantidad de entradas a devolver.
         user_id (int): ID del usuario que realiza la devolución.
+        idempotency_key (str, optional): Clave del cliente; un reintento con la misma clave no vuelve a devolver.
         
     Raises:
-        ValueError: Si la cantidad es inválida, el evento no existe o se intenta devolver más de lo vendido.
+        ValueError: Si la cantidad es inválida, el evento no existe, se intenta devolver más de lo vendido
+            o la clave ya se usó en otra operación.
+    """
+    _idempotent(event_id, qty, user_id, "REFUND", idempotency_key)
+
+def _idempotent(event_id: int, qty: int, user_id: int, mtype: str, key: Optional[str]) -> None:
+    """
+    Aplica la venta o devolución (_apply_movement) una sola vez por clave de idempotencia.
+    
+    Un reintento con una clave ya registrada en movements se responde con esa fila, sin bloquear
+    el evento. Si dos intentos con la misma clave corren a la vez, el índice único hace fallar
+    (y deshace) al segundo, que entonces se trata como reintento.
     """
     if qty <= 0: raise ValueError("Cantidad debe ser > 0")
+    t0 = time.perf_counter()
+    if key is not None and _replayed(key, event_id, qty, user_id, mtype):
+        return
+    try:
+        _apply_movement(event_id, qty, user_id, mtype, t0, key)
+    except psycopg.errors.UniqueViolation:
+        if key is None or not _replayed(key, event_id, qty, user_id, mtype): raise
+
+def _replayed(key: str, event_id: int, qty: int, user_id: int, mtype: str) -> bool:
+    """
+    Indica si la clave ya registró un movimiento idéntico.
+    
+    Raises:
+        ValueError: Si la clave pertenece a un movimiento con otros datos.
+    """
     with get_conn() as c, c.cursor() as cur:
-        cur.execute("SELECT seats_sold FROM events WHERE id=%s FOR UPDATE", (event_id,))
+        cur.execute(_REPLAY_SQL, (key,))
         row = cur.fetchone()
-        if not row: raise ValueError("Evento no existe")
-        sold = row[0]
-        if sold - qty < 0: raise ValueError("No se puede devolver más de lo vendido")
-        cur.execute("UPDATE events SET seats_sold = seats_sold - %s, updated_at=now() WHERE id=%s", (qty, event_id))
-        cur.execute("INSERT INTO movements(event_id,type,qty,user_id) VALUES(%s,'REFUND',%s,%s)",
-                    (event_id, qty, user_id))
-        log_sale_operation(event_id, user_id, qty, "REFUND")
+    return _replay_matches(row, event_id, qty, user_id, mtype)
 
-# ---------- Consulta y reporte ----------
-def list_events(q: str = "", category: str = "", status: str = "", dt_from: datetime = None, dt_to: datetime = None) -> List[tuple]:
+_REPLAY_SQL = "SELECT event_id, type, qty, user_id FROM movements WHERE idempotency_key=%s"
+
+def _replay_matches(row: Optional[tuple], event_id: int, qty: int, user_id: int, mtype: str) -> bool:
     """
-    Lista eventos con filtros opcionales.
+    Compara el movimiento registrado con una clave (fila de _REPLAY_SQL) con el solicitado.
+    
+    Returns:
+        bool: True si es el mismo movimiento (reintento), False si la clave no existe.
+    
+    Raises:
+        ValueError: Si la clave pertenece a un movimiento con otros datos.
+    """
+    if row is None:
+        return False
+    if row != (event_id, mtype, qty, user_id):
+        raise ValueError("Clave de idempotencia ya usada en otra operación")
+    with _idempotency_lock:
+        _idempotency_stats["replays"] += 1
+    return True
+
+def idempotency_stats() -> dict:
+    """
+    Retorna la cantidad de reintentos respondidos con un movimiento ya registrado.
+    
+    Returns:
+        dict: Diccionario con (replays).
+    """
+    with _idempotency_lock:
+        return dict(_idempotency_stats)
+
+def purge_idempotency_keys(retention_days: int = IDEMPOTENCY_RETENTION_DAYS, batch_size: int = 10_000) -> int:
+    """
+    Olvida las claves de idempotencia más antiguas que ``retention_days`` (el movimiento se conserva).
     
     Args:
-        q (str, optional): Palabra clave para buscar en nombre y descripción.
-        category (str, optional): Filtrar por categoría.
-        status (str, optional): Filtrar por estado (upcoming, past, soldout).
-        dt_from (datetime, optional): Fecha de inicio del rango.
-        dt_to (datetime, optional): Fecha de fin del rango.
+        retention_days (int, optional): Días que se conserva cada clave. Defaults to IDEMPOTENCY_RETENTION_DAYS.
+        batch_size (int, optional): Claves por transacción. Defaults to 10_000.
+        
+    Returns:
+        int: Cantidad de claves eliminadas.
+    """
+    total = 0
+    while True:
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE movements SET idempotency_key = NULL
+                WHERE id IN (
+                    SELECT id FROM movements
+                    WHERE idempotency_key IS NOT NULL AND created_at < now() - make_interval(days => %s)
+                    LIMIT %s
+                )
+                """,
+                (retention_days, batch_size),
+            )
+            n = cur.rowcount
+        total += n
+        if n < batch_size:
+            break
+    if total:
+        log_operation("IDEMPOTENCY_PURGE", f"keys={total}, retention_days={retention_days}")
+    return total
+
+@lru_cache(maxsize=None)
+def _movement_sql(mtype: str) -> str:
+    """
+    Sentencia de venta/devolución condicional: UPDATE de cupos encadenado al INSERT del movimiento.
+    
+    Parámetros en orden: (qty, event_id, qty, mtype, qty, user_id, key). Retorna el ID del movimiento
+    o ninguna fila si el evento no existe o no cumple la condición de cupos.
+    """
+    if mtype == "SALE":
+        delta, condition = "+", "seats_total - seats_sold - seats_held - seats_sharded >= %s"
+    else:
+        delta, condition = "-", "seats_sold >= %s"
+    return f"""
+        WITH upd AS (
+            UPDATE events SET seats_sold = seats_sold {delta} %s, updated_at=now()
+            WHERE id=%s AND {condition}
+            RETURNING id
+        )
+        INSERT INTO movements(event_id,type,qty,user_id,idempotency_key)
+        SELECT id, %s, %s, %s, %s FROM upd RETURNING id
+    """
+
+def _movement_error(mtype: str, exists: bool) -> ValueError:
+    """Error de negocio para una venta/devolución rechazada."""
+    if not exists: return ValueError("Evento no existe")
+    if mtype == "SALE": return ValueError("No hay cupos suficientes")
+    return ValueError("No se puede devolver más de lo vendido")
+
+_EXISTS_SQL = "SELECT 1 FROM events WHERE id=%s"
+
+def _movement_steps(event_id: int, qty: int, user_id: int, mtype: str, key: Optional[str]):
+    """
+    Sentencias de una venta o devolución según SALE_MODE, compartidas por domain y domain_async.
+    
+    Generador sin E/S: cada ``yield (sql, params)`` recibe la primera fila del resultado (o None);
+    lo ejecutan _run_steps y domain_async._run_steps dentro de una transacción.
+    
+    - lock: bloquea la fila del evento (SELECT ... FOR UPDATE), valida y actualiza.
+    - conditional: un único UPDATE condicional encadenado al INSERT del movimiento.
+    - sharded: un shard libre al azar (SKIP LOCKED), la fila del evento (como conditional),
+      esperando el lock de algún shard y, si ninguna fila cubre la cantidad, consolidando los shards
+      en la fila del evento (ver _reshard_steps). Los eventos sin shards resuelven en el segundo intento.
+    
+    Una venta sin cupos libera las reservas expiradas del evento y, si había alguna, se reintenta una vez.
+    
+    Raises:
+        ValueError: Si el evento no existe o la condición de cupos no se cumple.
+    """
+    for attempt in range(2):
+        if (yield from _movement_attempt(event_id, qty, user_id, mtype, key)):
+            return
+        if attempt or mtype != "SALE" or (yield _release_expired_sql(True), ([event_id], HOLD_SWEEP_BATCH)) is None:
+            raise _movement_error(mtype, True)
+
+def _movement_attempt(event_id: int, qty: int, user_id: int, mtype: str, key: Optional[str]):
+    """
+    Un intento de _movement_steps según SALE_MODE.
+    
+    Returns:
+        bool: True si se aplicó el movimiento, False si el evento existe pero no cumple la condición de cupos.
+    
+    Raises:
+        ValueError: Si el evento no existe.
+    """
+    movement_params = (qty, event_id, qty, mtype, qty, user_id, key)
+    if SALE_MODE == "conditional":
+        if (yield _movement_sql(mtype), movement_params) is not None:
+            return True
+        if (yield _EXISTS_SQL, (event_id,)) is None: raise _movement_error(mtype, False)
+        return False
+    if SALE_MODE == "sharded":
+        shard_params = (event_id, qty, qty, qty, mtype, qty, user_id, key)
+        if (yield _sharded_movement_sql(mtype, True), shard_params) is not None:
+            return True
+        if (yield _movement_sql(mtype), movement_params) is not None:
+            return True
+        # Esperando el lock: si otra transacción agotó el shard mientras se esperaba, la sentencia
+        # no retorna filas y se reintenta mientras quede algún shard que cumpla la condición
+        column = "seats_free" if mtype == "SALE" else "seats_sold"
+        for _ in range(SHARDS_MAX):
+            if (yield _sharded_movement_sql(mtype, False), shard_params) is not None:
+                return True
+            if (yield f"SELECT 1 FROM event_seat_shards WHERE event_id=%s AND {column} >= %s LIMIT 1", (event_id, qty)) is None:
+                break
+        # Ninguna fila cubre qty por sí sola: se consolidan los shards en la fila del evento, se aplica
+        # ahí y se vuelven a repartir, todo en la misma transacción
+        shards = (yield "SELECT COUNT(*) FROM event_seat_shards WHERE event_id=%s", (event_id,))[0]
+        if not shards:
+            if (yield _EXISTS_SQL, (event_id,)) is None: raise _movement_error(mtype, False)
+            return False
+        if (yield from _reshard_steps(event_id, 0)) is None: raise _movement_error(mtype, False)
+        if (yield _movement_sql(mtype), movement_params) is None:
+            yield from _reshard_steps(event_id, shards)
+            return False
+        yield from _reshard_steps(event_id, shards)
+        return True
+    row = yield "SELECT seats_total, seats_sold, seats_held, seats_sharded FROM events WHERE id=%s FOR UPDATE", (event_id,)
+    if not row: raise _movement_error(mtype, False)
+    total, sold, held, sharded = row
+    if (mtype == "SALE" and total - sold - held - sharded < qty) or (mtype == "REFUND" and sold < qty):
+        return False
+    yield ("UPDATE events SET seats_sold = seats_sold + %s, updated_at=now() WHERE id=%s",
+           (qty if mtype == "SALE" else -qty, event_id))
+    yield ("INSERT INTO movements(event_id,type,qty,user_id,idempotency_key) VALUES(%s,%s,%s,%s,%s)",
+           (event_id, mtype, qty, user_id, key))
+    return True
+
+@lru_cache(maxsize=None)
+def _release_expired_sql(by_event: bool) -> str:
+    """
+    Sentencia que borra hasta ``batch_size`` reservas expiradas (de los eventos indicados o de todos)
+    y descuenta sus cupos de events.seats_held, vía el índice por expiración.
+    
+    Las filas tomadas por otro barrido concurrente se saltan (SKIP LOCKED).
+    Parámetros en orden: ([event_ids], batch_size). Retorna (event_id, reservas) por evento.
+    """
+    event_filter = "AND event_id = ANY(%s)" if by_event else ""
+    return f"""
+        WITH expired AS (
+            DELETE FROM holds WHERE id IN (
+                SELECT id FROM holds WHERE expires_at <= now() {event_filter}
+                ORDER BY expires_at LIMIT %s FOR UPDATE SKIP LOCKED
+            ) RETURNING event_id, qty
+        ), per_event AS (
+            SELECT event_id, SUM(qty) AS qty, COUNT(*) AS n FROM expired GROUP BY event_id
+        ), upd AS (
+            UPDATE events e SET seats_held = e.seats_held - p.qty, updated_at=now()
+            FROM per_event p WHERE e.id = p.event_id
+        )
+        SELECT event_id, n FROM per_event ORDER BY event_id
+    """
+
+def _release_expired(cur, batch_size: int, event_ids: List[int] = None) -> int:
+    """
+    Libera hasta ``batch_size`` reservas expiradas de ``event_ids`` (o de todos los eventos).
+    
+    Returns:
+        int: Cantidad de reservas liberadas.
+    """
+    params = (event_ids, batch_size) if event_ids is not None else (batch_size,)
+    cur.execute(_release_expired_sql(event_ids is not None), params)
+    rows = cur.fetchall()
+    _event_cache.invalidate(*(r[0] for r in rows))
+    return sum(r[1] for r in rows)
+
+def _run_steps(cur, steps):
+    """
+    Ejecuta un generador de sentencias (ver _movement_steps) sobre ``cur``.
+    
+    Returns:
+        El valor de retorno del generador.
+    """
+    row = None
+    try:
+        while True:
+            sql, params = steps.send(row)
+            cur.execute(sql, params)
+            row = cur.fetchone() if cur.description else None
+    except StopIteration as stop:
+        return stop.value
+
+def _apply_movement(event_id: int, qty: int, user_id: int, mtype: str, t0: float, key: str = None) -> None:
+    """
+    Aplica una venta o devolución según SALE_MODE en una transacción.
+    
+    Args:
+        event_id (int): ID del evento.
+        qty (int): Cantidad de entradas.
+        user_id (int): ID del usuario que realiza la operación.
+        mtype (str): Tipo de movimiento (SALE o REFUND).
+        t0 (float): Instante de inicio (time.perf_counter) para medir la latencia.
+        key (str, optional): Clave de idempotencia del movimiento.
         
+    Raises:
+        ValueError: Si el evento no existe o la condición de cupos no se cumple.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        _run_steps(cur, _movement_steps(event_id, qty, user_id, mtype, key))
+    _event_cache.invalidate(event_id)
+    log_sale_operation(event_id, user_id, qty, mtype, _ms_since(t0))
+
+@lru_cache(maxsize=None)
+def _sharded_movement_sql(mtype: str, skip_locked: bool) -> str:
+    """
+    Sentencia de venta/devolución sobre un shard del evento, encadenada al INSERT del movimiento.
+    
+    El shard se elige al azar entre los que cumplen la condición; con ``skip_locked`` se saltan
+    los shards ocupados por otra transacción en vez de esperarlos.
+    Parámetros en orden: (event_id, qty, qty, qty, mtype, qty, user_id, key).
+    """
+    if mtype == "SALE":
+        free, sold, condition = "-", "+", "seats_free >= %s"
+    else:
+        free, sold, condition = "+", "-", "seats_sold >= %s"
+    return f"""
+        WITH s AS (
+            SELECT event_id, shard FROM event_seat_shards
+            WHERE event_id=%s AND {condition}
+            ORDER BY random() LIMIT 1
+            FOR UPDATE{" SKIP LOCKED" if skip_locked else ""}
+        ), upd AS (
+            UPDATE event_seat_shards t SET seats_free = t.seats_free {free} %s, seats_sold = t.seats_sold {sold} %s
+            FROM s WHERE t.event_id = s.event_id AND t.shard = s.shard
+            RETURNING t.event_id
+        )
+        INSERT INTO movements(event_id,type,qty,user_id,idempotency_key)
+        SELECT event_id, %s, %s, %s, %s FROM upd RETURNING id
+    """
+
+def _reshard(cur, event_id: int, shards: int) -> Optional[dict]:
+    """
+    Consolida los vendidos de los shards en la fila del evento y reparte de nuevo sus cupos libres.
+    
     Returns:
-        List[tuple]: Lista de tuplas con información de eventos.
+        Optional[dict]: Resultado con (event_id, shards, consolidated, free) o None si el evento no existe.
     """
-    clauses = []; params = []
-    if q:         clauses += ["(name ILIKE %s OR description ILIKE %s)"]; params += [f"%{q}%", f"%{q}%"]
-    if category:  clauses += ["category=%s"]; params += [category]
-    if dt_from:   clauses += ["starts_at >= %s"]; params += [dt_from]
-    if dt_to:     clauses += ["starts_at <= %s"]; params += [dt_to]
+    return _run_steps(cur, _reshard_steps(event_id, shards))
+
+def _reshard_steps(event_id: int, shards: int):
+    """
+    Sentencias de _reshard, como generador sin E/S (ver _movement_steps).
+    
+    Los cupos libres del evento se dividen en ``shards + 1`` partes: una queda en la fila de events
+    (para holds, sell_many y el respaldo de las ventas) y el resto va a los shards.
+    
+    Returns:
+        Optional[dict]: Resultado con (event_id, shards, consolidated, free) o None si el evento no existe.
+    """
+    row = yield "SELECT seats_total, seats_sold, seats_held FROM events WHERE id=%s FOR UPDATE", (event_id,)
+    if not row: return None
+    total, sold, held = row
+    consolidated = (yield ("SELECT COALESCE(SUM(seats_sold),0) FROM (SELECT seats_sold FROM event_seat_shards WHERE event_id=%s FOR UPDATE) s",
+                           (event_id,)))[0]
+    sold += consolidated
+    free = total - sold - held
+    per_shard = free // (shards + 1) if shards else 0
+    yield "DELETE FROM event_seat_shards WHERE event_id=%s", (event_id,)
+    if per_shard:
+        yield ("INSERT INTO event_seat_shards(event_id,shard,seats_free) SELECT %s, s, %s FROM generate_series(0, %s) s",
+               (event_id, per_shard, shards - 1))
+    yield ("UPDATE events SET seats_sold=%s, seats_sharded=%s, updated_at=now() WHERE id=%s",
+           (sold, per_shard * shards, event_id))
+    return {"event_id": event_id, "shards": shards if per_shard else 0, "consolidated": consolidated, "free": free}
+
+@retry_transaction
+def shard_event(event_id: int, shards: int = 8) -> dict:
+    """
+    Reparte los cupos libres de un evento en ``shards`` filas para SALE_MODE=sharded.
+    
+    Args:
+        event_id (int): ID del evento.
+        shards (int, optional): Cantidad de shards (0 devuelve todos los cupos a la fila del evento). Defaults to 8.
+        
+    Returns:
+        dict: Resultado con (event_id, shards, consolidated, free).
+        
+    Raises:
+        ValueError: Si la cantidad de shards es inválida o el evento no existe.
+    """
+    if not 0 <= shards <= SHARDS_MAX: raise ValueError(f"Shards debe estar entre 0 y {SHARDS_MAX}")
+    with get_conn() as c, c.cursor() as cur:
+        result = _reshard(cur, event_id, shards)
+        if result is None: raise ValueError("Evento no existe")
+    _event_cache.invalidate(event_id)
+    log_event_operation(event_id, "SHARD", shards=result["shards"], free=result["free"])
+    return result
+
+def consolidate_shards(event_id: int = None) -> List[dict]:
+    """
+    Consolida los shards de un evento (o de todos) sin cambiar su cantidad de shards.
+    
+    Los vendidos acumulados en los shards pasan a events.seats_sold (resumen, agotados y filtros
+    de list_events los reflejan desde ahí) y los cupos libres se reparten de nuevo, de modo que
+    los shards agotados vuelven a tener cupos. Pensado para ejecutarse periódicamente.
+    
+    Returns:
+        List[dict]: Un resultado por evento con (event_id, shards, consolidated, free).
+    """
+    with get_conn() as c, c.cursor() as cur:
+        sql = "SELECT event_id, COUNT(*) FROM event_seat_shards"
+        if event_id is not None:
+            cur.execute(sql + " WHERE event_id=%s GROUP BY event_id", (event_id,))
+        else:
+            cur.execute(sql + " GROUP BY event_id ORDER BY event_id")
+        targets = cur.fetchall()
+    results = []
+    for eid, shards in targets:
+        with get_conn() as c, c.cursor() as cur:
+            result = _reshard(cur, eid, shards)
+        if result is not None:
+            _event_cache.invalidate(eid)
+            results.append(result)
+    return results
+
+def start_consolidator(interval: float = 60.0) -> threading.Event:
+    """
+    Inicia un hilo daemon que ejecuta consolidate_shards cada ``interval`` segundos.
+    
+    Returns:
+        threading.Event: Evento que detiene el hilo al activarse (``set()``).
+    """
+    stop = threading.Event()
+    def run():
+        while not stop.wait(interval):
+            try:
+                consolidate_shards()
+            except Exception as e:
+                log_operation("SHARD_CONSOLIDATE_ERROR", str(e))
+    threading.Thread(target=run, name="shard-consolidator", daemon=True).start()
+    return stop
+
+def _ms_since(t0: float) -> float:
+    """Milisegundos transcurridos desde ``t0`` (time.perf_counter)."""
+    return (time.perf_counter() - t0) * 1000
+
+# ---------- Consulta y reporte ----------
+@lru_cache(maxsize=None)
+def _list_events_query(has_q: bool, has_category: bool, has_from: bool, has_to: bool, status: str,
+                       has_after: bool, has_limit: bool) -> str:
+    """
+    Arma (y memoriza) la sentencia SQL de list_events para una combinación de filtros.
+    
+    Returns:
+        str: Sentencia SQL con placeholders en el orden de _list_events_sql.
+    """
+    clauses = []
+    if has_q:        clauses += ["(name ILIKE %s OR description ILIKE %s)"]
+    if has_category: clauses += ["category=%s"]
+    if has_from:     clauses += ["starts_at >= %s"]
+    if has_to:       clauses += ["starts_at <= %s"]
     if status == "soldout":
         clauses += ["(seats_total - seats_sold) = 0"]
     elif status == "upcoming":
         clauses += ["starts_at >= NOW()"]
     elif status == "past":
         clauses += ["starts_at < NOW()"]
+    if has_after:    clauses += ["(starts_at, id) > (%s, %s)"]
 
     where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-    sql = f"SELECT id,name,starts_at,category,price,seats_total,seats_sold FROM events{where} ORDER BY starts_at"
+    sql = f"SELECT id,name,starts_at,category,price,seats_total,seats_sold FROM events{where} ORDER BY starts_at, id"
+    if has_limit:
+        sql += " LIMIT %s"
+    return sql
+
+def _list_events_sql(q: str = "", category: str = "", status: str = "", dt_from: datetime = None, dt_to: datetime = None,
+                     after: Tuple[datetime,int] = None, limit: int = None) -> Tuple[str, list]:
+    """
+    Construye la consulta SQL de list_events para una combinación de filtros.
+    
+    Los resultados se ordenan por (starts_at, id), lo que permite paginar por keyset con ``after``.
+    
+    Returns:
+        Tuple[str, list]: Sentencia SQL y sus parámetros.
+    """
+    params = []
+    if q:         params += [f"%{q}%", f"%{q}%"]
+    if category:  params += [category]
+    if dt_from:   params += [dt_from]
+    if dt_to:     params += [dt_to]
+    if after:     params += list(after)
+    if limit:     params += [limit]
+    if status not in ("soldout", "upcoming", "past"):
+        status = ""
+    sql = _list_events_query(bool(q), bool(category), bool(dt_from), bool(dt_to), status, bool(after), bool(limit))
+    return sql, params
+
+def _execute_prepared(conn, cur, sql: str, params: list) -> None:
+    """
+    Ejecuta ``sql`` como sentencia preparada en el servidor, contabilizando si la conexión ya la tenía preparada.
+    """
+    with _prepared_lock:
+        seen = _prepared_by_conn.setdefault(conn, set())
+        if sql in seen:
+            _prepare_stats["hits"] += 1
+        else:
+            _prepare_stats["prepares"] += 1
+            seen.add(sql)
+    cur.execute(sql, params, prepare=True)
+
+def list_query_stats() -> dict:
+    """
+    Retorna la instrumentación de las consultas de list_events.
+    
+    Returns:
+        dict: Diccionario con (sql_cache_hits, sql_cache_misses, prepare_hits, prepares).
+    """
+    info = _list_events_query.cache_info()
+    with _prepared_lock:
+        return {"sql_cache_hits": info.hits, "sql_cache_misses": info.misses,
+                "prepare_hits": _prepare_stats["hits"], "prepares": _prepare_stats["prepares"]}
+
+@instrument
+@retry_transaction
+def list_events(q: str = "", category: str = "", status: str = "", dt_from: datetime = None, dt_to: datetime = None,
+                after: Tuple[datetime,int] = None, limit: int = None) -> List[tuple]:
+    """
+    Lista eventos con filtros opcionales.
+    
+    Args:
+        q (str, optional): Palabra clave para buscar en nombre y descripción.
+        category (str, optional): Filtrar por categoría.
+        status (str, optional): Filtrar por estado (upcoming, past, soldout).
+        dt_from (datetime, optional): Fecha de inicio del rango.
+        dt_to (datetime, optional): Fecha de fin del rango.
+        after (Tuple[datetime,int], optional): (starts_at, id) del último evento de la página anterior.
+        limit (int, optional): Máximo de eventos a retornar. Sin límite por defecto.
+        
+    Returns:
+        List[tuple]: Lista de tuplas con información de eventos ordenada por (starts_at, id).
+    """
+    sql, params = _list_events_sql(q, category, status, dt_from, dt_to, after, limit)
     with get_conn() as c, c.cursor() as cur:
+        _execute_prepared(c, cur, sql, params)
+        rows = cur.fetchall()
+    return rows
+
+def iter_events(q: str = "", category: str = "", status: str = "", dt_from: datetime = None, dt_to: datetime = None,
+                batch_size: int = 1000) -> Iterator[tuple]:
+    """
+    Recorre los eventos filtrados con un cursor del servidor, en lotes de ``batch_size`` filas.
+    
+    Args:
+        q, category, status, dt_from, dt_to: Mismos filtros que list_events.
+        batch_size (int, optional): Filas traídas por cada viaje al servidor. Defaults to 1000.
+        
+    Yields:
+        tuple: Información de cada evento, en el mismo formato que list_events.
+        
+    Note:
+        La conexión permanece tomada del pool hasta agotar o cerrar el generador.
+    """
+    sql, params = _list_events_sql(q, category, status, dt_from, dt_to)
+    with get_conn() as c, c.cursor(name="iter_events") as cur:
+        cur.itersize = batch_size
         cur.execute(sql, params)
+        yield from cur
+
+_SEARCH_WORD = re.compile(r"\w+")
+
+def _search_tsquery(q: str) -> str:
+    """
+    Convierte el texto ingresado en un tsquery: todas las palabras deben aparecer y la última
+    se busca como prefijo (búsqueda mientras se escribe).
+
+    Solo se conservan caracteres de palabra, así que el resultado no contiene operadores del usuario.
+    """
+    words = _SEARCH_WORD.findall(q)
+    if not words:
+        return ""
+    words[-1] += ":*"
+    return " & ".join(words)
+
+@lru_cache(maxsize=None)
+def _search_events_query(has_category: bool, has_from: bool, has_to: bool) -> str:
+    """
+    Arma (y memoriza) la sentencia SQL de search_events para una combinación de filtros.
+    """
+    clauses = ["search_vector @@ query"]
+    if has_category: clauses += ["category=%s"]
+    if has_from:     clauses += ["starts_at >= %s"]
+    if has_to:       clauses += ["starts_at <= %s"]
+    return (
+        "SELECT id,name,starts_at,category,price,seats_total,seats_sold "
+        "FROM events, to_tsquery('es_unaccent', %s) query "
+        f"WHERE {' AND '.join(clauses)} "
+        "ORDER BY ts_rank(search_vector, query) DESC, starts_at, id LIMIT %s OFFSET %s"
+    )
+
+@instrument
+@retry_transaction
+def search_events(q: str, category: str = "", dt_from: datetime = None, dt_to: datetime = None,
+                  limit: int = 20, offset: int = 0) -> List[tuple]:
+    """
+    Busca eventos por texto completo en nombre y descripción, ordenados por relevancia.
+
+    Usa la columna search_vector (configuración es_unaccent: stemming en español y sin
+    acentos) y su índice GIN; las coincidencias en el nombre pesan más que en la descripción.
+
+    Args:
+        q (str): Texto a buscar; la última palabra se busca como prefijo.
+        category (str, optional): Filtrar por categoría.
+        dt_from (datetime, optional): Fecha de inicio del rango.
+        dt_to (datetime, optional): Fecha de fin del rango.
+        limit (int, optional): Máximo de eventos a retornar. Defaults to 20.
+        offset (int, optional): Eventos a saltar (paginación). Defaults to 0.
+
+    Returns:
+        List[tuple]: Eventos en el mismo formato que list_events, de mayor a menor relevancia.
+    """
+    tsquery = _search_tsquery(q)
+    if not tsquery:
+        return []
+    params = [tsquery]
+    if category:  params += [category]
+    if dt_from:   params += [dt_from]
+    if dt_to:     params += [dt_to]
+    params += [limit, offset]
+    sql = _search_events_query(bool(category), bool(dt_from), bool(dt_to))
+    with get_conn() as c, c.cursor() as cur:
+        _execute_prepared(c, cur, sql, params)
         rows = cur.fetchall()
     return rows
 
+# Fila de get_event: los vendidos incluyen los acumulados en shards aún sin consolidar
+_GET_EVENT_SQL = """
+    SELECT id, name, description, starts_at, category, price, seats_total,
+           seats_sold + COALESCE((SELECT SUM(s.seats_sold) FROM event_seat_shards s WHERE s.event_id = e.id), 0)::int
+    FROM events e WHERE id=%s
+"""
+
+@instrument
+@retry_transaction
 def get_event(event_id: int):
     """
     Obtiene la información completa de un evento.
@@ -222,28 +956,134 @@ def get_event(event_id: int):
         
     Returns:
         tuple: Tupla con toda la información del evento o None si no existe.
+        
+    Note:
+        Las filas se sirven desde una caché LRU/TTL en memoria (ver event_cache_stats).
     """
+    row = _event_cache.get(event_id)
+    if row is not None:
+        return row
+    since = _event_cache.version()
     with get_conn() as c, c.cursor() as cur:
-        cur.execute(
-            """
-            SELECT id, name, description, starts_at, category, price, seats_total, seats_sold
-            FROM events WHERE id=%s
-            """,
-            (event_id,)
-        )
+        cur.execute(_GET_EVENT_SQL, (event_id,))
         row = cur.fetchone()
+    if row is not None:
+        _event_cache.set(event_id, row, since)
     return row
 
+def event_cache_stats() -> dict:
+    """
+    Retorna los contadores de la caché de eventos.
+    
+    Returns:
+        dict: Diccionario con (size, maxsize, hits, misses, evictions).
+    """
+    return _event_cache.stats()
+
+# Totales del resumen (base + deltas pendientes) y eventos agotados; también los usa domain_async
+_SUMMARY_SQL = """
+    SELECT COALESCE(SUM(total_events),0)::bigint, COALESCE(SUM(sum_available),0)::bigint
+    FROM (SELECT total_events, sum_available FROM events_summary
+          UNION ALL SELECT total_events, sum_available FROM events_summary_delta) s
+"""
+_SOLD_OUT_SQL = "SELECT id,name FROM events WHERE (seats_total - seats_sold)=0"
+
+@instrument
+@retry_transaction
 def report_summary() -> dict:
     """
     Genera un resumen estadístico del sistema.
     
     Returns:
         dict: Diccionario con estadísticas (total_events, sum_available, sold_out).
+        
+    Note:
+        Los totales se leen de ``events_summary`` más los deltas que los triggers anotan en
+        ``events_summary_delta`` (solo lectura; los pliega start_summary_compactor); los agotados
+        usan el índice parcial.
     """
     with get_conn() as c, c.cursor() as cur:
-        cur.execute("SELECT COUNT(*), COALESCE(SUM(seats_total - seats_sold),0) FROM events")
+        cur.execute(_SUMMARY_SQL)
         total, sum_available = cur.fetchone()
-        cur.execute("SELECT id,name FROM events WHERE (seats_total - seats_sold)=0")
+        cur.execute(_SOLD_OUT_SQL)
         sold_out = cur.fetchall()
     return {"total_events": total, "sum_available": sum_available, "sold_out": sold_out}
+
+@retry_transaction
+def compact_summary() -> int:
+    """
+    Pliega los deltas de ``events_summary_delta`` en ``events_summary``.
+
+    Solo borra los deltas ya confirmados; los de transacciones en curso quedan para la próxima vez.
+
+    Returns:
+        int: Cantidad de deltas plegados.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute(
+            """
+            WITH d AS (DELETE FROM events_summary_delta RETURNING total_events, sum_available),
+            upd AS (
+                UPDATE events_summary
+                   SET total_events = total_events + (SELECT COALESCE(SUM(total_events), 0) FROM d),
+                       sum_available = sum_available + (SELECT COALESCE(SUM(sum_available), 0) FROM d)
+            )
+            SELECT COUNT(*) FROM d
+            """
+        )
+        return cur.fetchone()[0]
+
+def start_summary_compactor(interval: float = SUMMARY_COMPACT_INTERVAL) -> threading.Event:
+    """
+    Inicia un hilo daemon que ejecuta compact_summary cada ``interval`` segundos.
+    
+    Returns:
+        threading.Event: Evento que detiene el hilo al activarse (``set()``).
+    """
+    stop = threading.Event()
+    def run():
+        while not stop.wait(interval):
+            try:
+                compact_summary()
+            except Exception as e:
+                log_operation("SUMMARY_COMPACT_ERROR", str(e))
+    threading.Thread(target=run, name="summary-compactor", daemon=True).start()
+    return stop
+
+def check_summary(fix: bool = False) -> dict:
+    """
+    Recalcula el resumen desde ``events`` y lo compara con ``events_summary``.
+    
+    Args:
+        fix (bool, optional): Si es True, reescribe ``events_summary`` con los valores recalculados. Defaults to False.
+        
+    Returns:
+        dict: Diccionario con (stored, actual, drift), cada uno con total_events y sum_available.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        if fix:
+            cur.execute("LOCK TABLE events IN SHARE MODE")
+        cur.execute(
+            """
+            SELECT COALESCE(SUM(s.total_events),0)::bigint, COALESCE(SUM(s.sum_available),0)::bigint,
+                   (SELECT COUNT(*) FROM events), (SELECT COALESCE(SUM(seats_total - seats_sold),0)::bigint FROM events)
+            FROM (SELECT total_events, sum_available FROM events_summary
+                  UNION ALL SELECT total_events, sum_available FROM events_summary_delta) s
+            """
+        )
+        st_total, st_avail, total, avail = cur.fetchone()
+        drift = {"total_events": st_total - total, "sum_available": st_avail - avail}
+        if fix and any(drift.values()):
+            cur.execute("DELETE FROM events_summary_delta")
+            cur.execute(
+                """INSERT INTO events_summary(id, total_events, sum_available) VALUES(true, %s, %s)
+                   ON CONFLICT (id) DO UPDATE SET total_events = EXCLUDED.total_events, sum_available = EXCLUDED.sum_available""",
+                (total, avail),
+            )
+    if any(drift.values()):
+        log_operation("SUMMARY_DRIFT", f"drift={drift}, fixed={fix}")
+    return {
+        "stored": {"total_events": st_total, "sum_available": st_avail},
+        "actual": {"total_events": total, "sum_available": avail},
+        "drift": drift,
+    }
@@ -0,0 +1,183 @@
+import time
+import psycopg
+from datetime import datetime
+from typing import Optional, List, Tuple
+from db import get_async_conn, retry_transaction
+from metrics import instrument
+from domain import (
+    validate_event, _auth_result, _check_login_rate, _event_cache, _ms_since, _list_events_sql, _movement_steps,
+    _replay_matches, _AUTH_SQL, _CREATE_EVENT_SQL, _GET_EVENT_SQL, _REPLAY_SQL, _SUMMARY_SQL, _SOLD_OUT_SQL,
+)
+from hashing import check_password_async
+from logger import log_event_operation, log_sale_operation
+
+# Contraparte asíncrona (psycopg.AsyncConnection) de la API de domain.py.
+# Comparte validaciones, SQL, caché de eventos y log con la versión síncrona.
+
+# ---------- Usuarios ----------
+@instrument
+async def auth_user(username: str, password: str, client: str = "") -> Optional[Tuple[int,str]]:
+    """
+    Autentica un usuario con sus credenciales.
+
+    Args:
+        username (str): Nombre de usuario.
+        password (str): Contraseña en texto plano.
+        client (str, optional): Identificador del cliente (p. ej. IP) para el límite de intentos.
+
+    Returns:
+        Optional[Tuple[int,str]]: Tupla con (user_id, role) si la autenticación es exitosa, None en caso contrario.
+
+    Raises:
+        LoginThrottled: Si el usuario o el cliente excedieron el límite de intentos.
+
+    Note:
+        bcrypt se ejecuta en el pool de hashing para no bloquear el event loop.
+    """
+    _check_login_rate(username, client)
+    async with get_async_conn() as c, c.cursor() as cur:
+        await cur.execute(_AUTH_SQL, (username,))
+        row = await cur.fetchone()
+    if not row:
+        return _auth_result(username, None, False)
+    return _auth_result(username, row, await check_password_async(password, row[1]))
+
+# ---------- Eventos ----------
+@instrument
+@retry_transaction
+async def create_event(name: str, description: str, starts_at: datetime, category: str, price: int, seats_total: int) -> int:
+    """
+    Crea un nuevo evento en el sistema.
+
+    Returns:
+        int: ID del evento creado.
+
+    Raises:
+        ValueError: Si la categoría es inválida o los valores son negativos.
+    """
+    validate_event(category, price, seats_total)
+    async with get_async_conn() as c, c.cursor() as cur:
+        await cur.execute(_CREATE_EVENT_SQL, (name.strip(), description.strip(), starts_at, category, price, seats_total))
+        event_id = (await cur.fetchone())[0]
+    log_event_operation(event_id, "CREATE", name=name, category=category, price=price, seats_total=seats_total)
+    return event_id
+
+# ---------- Ventas/Devoluciones ----------
+async def _movement(event_id: int, qty: int, user_id: int, mtype: str, key: Optional[str] = None) -> None:
+    """
+    Aplica una venta o devolución según domain.SALE_MODE, una sola vez por clave de idempotencia.
+
+    Raises:
+        ValueError: Si la cantidad es inválida, el evento no existe, la condición de cupos no se cumple
+            o la clave ya se usó en otra operación.
+    """
+    if qty <= 0: raise ValueError("Cantidad debe ser > 0")
+    t0 = time.perf_counter()
+    if key is not None and await _replayed(key, event_id, qty, user_id, mtype):
+        return
+    try:
+        await _apply(event_id, qty, user_id, mtype, key)
+    except psycopg.errors.UniqueViolation:
+        if key is None or not await _replayed(key, event_id, qty, user_id, mtype): raise
+        return
+    _event_cache.invalidate(event_id)
+    log_sale_operation(event_id, user_id, qty, mtype, _ms_since(t0))
+
+async def _replayed(key: str, event_id: int, qty: int, user_id: int, mtype: str) -> bool:
+    """Versión asíncrona de domain._replayed."""
+    async with get_async_conn() as c, c.cursor() as cur:
+        await cur.execute(_REPLAY_SQL, (key,))
+        row = await cur.fetchone()
+    return _replay_matches(row, event_id, qty, user_id, mtype)
+
+async def _apply(event_id: int, qty: int, user_id: int, mtype: str, key: Optional[str]) -> None:
+    """Aplica el movimiento en una transacción según domain.SALE_MODE (ver domain._movement_steps)."""
+    async with get_async_conn() as c, c.cursor() as cur:
+        await _run_steps(cur, _movement_steps(event_id, qty, user_id, mtype, key))
+
+async def _run_steps(cur, steps):
+    """Versión asíncrona de domain._run_steps."""
+    row = None
+    try:
+        while True:
+            sql, params = steps.send(row)
+            await cur.execute(sql, params)
+            row = await cur.fetchone() if cur.description else None
+    except StopIteration as stop:
+        return stop.value
+
+@instrument
+@retry_transaction
+async def sell(event_id: int, qty: int, user_id: int, idempotency_key: str = None) -> None:
+    """
+    Vende entradas para un evento (ver domain.sell).
+
+    Raises:
+        ValueError: Si la cantidad es inválida, el evento no existe, no hay cupos suficientes
+            o la clave ya se usó en otra operación.
+    """
+    await _movement(event_id, qty, user_id, "SALE", idempotency_key)
+
+@instrument
+@retry_transaction
+async def refund(event_id: int, qty: int, user_id: int, idempotency_key: str = None) -> None:
+    """
+    Devuelve entradas de un evento (ver domain.refund).
+
+    Raises:
+        ValueError: Si la cantidad es inválida, el evento no existe, se intenta devolver más de lo vendido
+            o la clave ya se usó en otra operación.
+    """
+    await _movement(event_id, qty, user_id, "REFUND", idempotency_key)
+
+# ---------- Consulta y reporte ----------
+@instrument
+@retry_transaction
+async def list_events(q: str = "", category: str = "", status: str = "", dt_from: datetime = None, dt_to: datetime = None,
+                      after: Tuple[datetime,int] = None, limit: int = None) -> List[tuple]:
+    """
+    Lista eventos con filtros opcionales (mismos parámetros y resultado que domain.list_events).
+
+    Returns:
+        List[tuple]: Lista de tuplas con información de eventos ordenada por (starts_at, id).
+    """
+    sql, params = _list_events_sql(q, category, status, dt_from, dt_to, after, limit)
+    async with get_async_conn() as c, c.cursor() as cur:
+        await cur.execute(sql, params, prepare=True)
+        return await cur.fetchall()
+
+@instrument
+@retry_transaction
+async def get_event(event_id: int):
+    """
+    Obtiene la información completa de un evento (compartiendo la caché de domain.get_event).
+
+    Returns:
+        tuple: Tupla con toda la información del evento o None si no existe.
+    """
+    row = _event_cache.get(event_id)
+    if row is not None:
+        return row
+    since = _event_cache.version()
+    async with get_async_conn() as c, c.cursor() as cur:
+        await cur.execute(_GET_EVENT_SQL, (event_id,))
+        row = await cur.fetchone()
+    if row is not None:
+        _event_cache.set(event_id, row, since)
+    return row
+
+@instrument
+@retry_transaction
+async def report_summary() -> dict:
+    """
+    Genera un resumen estadístico del sistema.
+
+    Returns:
+        dict: Diccionario con estadísticas (total_events, sum_available, sold_out).
+    """
+    async with get_async_conn() as c, c.cursor() as cur:
+        await cur.execute(_SUMMARY_SQL)
+        total, sum_available = await cur.fetchone()
+        await cur.execute(_SOLD_OUT_SQL)
+        sold_out = await cur.fetchall()
+    return {"total_events": total, "sum_available": sum_available, "sold_out": sold_out}
@@ -0,0 +1,53 @@
+import os
+import asyncio
+import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+# Costo de bcrypt (2^rounds iteraciones) y cantidad de hilos dedicados a hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+
+# bcrypt libera el GIL mientras calcula, por lo que un pool de hilos acotado basta para
+# usar varios núcleos sin saturar la máquina con hashes concurrentes.
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def _check(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+def hash_password(password: str) -> str:
+    """
+    Genera el hash bcrypt de una contraseña en el pool de hashing.
+
+    Args:
+        password (str): Contraseña en texto plano.
+
+    Returns:
+        str: Hash bcrypt con costo BCRYPT_ROUNDS.
+    """
+    with metrics.phase("bcrypt"):
+        return _executor.submit(_hash, password).result()
+
+def check_password(password: str, password_hash: str) -> bool:
+    """
+    Verifica una contraseña contra su hash bcrypt en el pool de hashing.
+
+    Args:
+        password (str): Contraseña en texto plano.
+        password_hash (str): Hash almacenado.
+
+    Returns:
+        bool: True si la contraseña coincide.
+    """
+    with metrics.phase("bcrypt"):
+        return _executor.submit(_check, password, password_hash).result()
+
+async def check_password_async(password: str, password_hash: str) -> bool:
+    """
+    Versión asíncrona de check_password que no bloquea el event loop.
+    """
+    with metrics.phase("bcrypt"):
+        return await asyncio.get_running_loop().run_in_executor(_executor, _check, password, password_hash)
@@ -0,0 +1,180 @@
+import os
+import threading
+from typing import Optional
+from db import get_conn, retry_transaction
+from metrics import instrument
+from domain import _event_cache, _release_expired, HOLD_SWEEP_BATCH
+from logger import log_operation, log_sale_operation
+
+# Duración por defecto de una reserva; el lote del barrido de expiradas es domain.HOLD_SWEEP_BATCH
+HOLD_TTL = int(os.getenv("HOLD_TTL", "600"))
+
+# ---------- Reservas ----------
+@instrument
+@retry_transaction
+def hold(event_id: int, qty: int, user_id: int, ttl: int = HOLD_TTL) -> int:
+    """
+    Reserva cupos de un evento por un tiempo limitado.
+
+    Args:
+        event_id (int): ID del evento.
+        qty (int): Cantidad de cupos a reservar.
+        user_id (int): ID del usuario que reserva.
+        ttl (int, optional): Segundos de validez de la reserva. Defaults to HOLD_TTL.
+
+    Returns:
+        int: ID de la reserva.
+
+    Raises:
+        ValueError: Si la cantidad es inválida, el evento no existe o no hay cupos disponibles.
+
+    Note:
+        Si no hay cupos, se liberan primero las reservas expiradas del evento y se reintenta una vez.
+    """
+    if qty <= 0: raise ValueError("Cantidad debe ser > 0")
+    with get_conn() as c, c.cursor() as cur:
+        for attempt in range(2):
+            cur.execute(
+                """
+                WITH upd AS (
+                    UPDATE events SET seats_held = seats_held + %s, updated_at=now()
+                    WHERE id=%s AND seats_total - seats_sold - seats_held - seats_sharded >= %s
+                    RETURNING id
+                )
+                INSERT INTO holds(event_id,user_id,qty,expires_at)
+                SELECT id, %s, %s, now() + make_interval(secs => %s) FROM upd RETURNING id
+                """,
+                (qty, event_id, qty, user_id, qty, ttl),
+            )
+            row = cur.fetchone()
+            if row or attempt or not _release_expired(cur, HOLD_SWEEP_BATCH, [event_id]):
+                break
+        if not row:
+            cur.execute("SELECT 1 FROM events WHERE id=%s", (event_id,))
+            if not cur.fetchone(): raise ValueError("Evento no existe")
+            raise ValueError("No hay cupos suficientes")
+        hold_id = row[0]
+    _event_cache.invalidate(event_id)
+    log_sale_operation(event_id, user_id, qty, "HOLD")
+    return hold_id
+
+@instrument
+@retry_transaction
+def confirm(hold_id: int) -> None:
+    """
+    Confirma una reserva vigente como venta (movimiento SALE).
+
+    Args:
+        hold_id (int): ID de la reserva.
+
+    Raises:
+        ValueError: Si la reserva no existe o ya expiró.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute(
+            """
+            WITH h AS (
+                DELETE FROM holds WHERE id=%s AND expires_at > now() RETURNING event_id, user_id, qty
+            ), upd AS (
+                UPDATE events e SET seats_held = e.seats_held - h.qty, seats_sold = e.seats_sold + h.qty, updated_at=now()
+                FROM h WHERE e.id = h.event_id
+            )
+            INSERT INTO movements(event_id,type,qty,user_id)
+            SELECT event_id, 'SALE', qty, user_id FROM h RETURNING event_id, user_id, qty
+            """,
+            (hold_id,),
+        )
+        row = cur.fetchone()
+        if not row: raise ValueError("Reserva no existe o expiró")
+    event_id, user_id, qty = row
+    _event_cache.invalidate(event_id)
+    log_sale_operation(event_id, user_id, qty, "SALE")
+
+@instrument
+@retry_transaction
+def release(hold_id: int) -> None:
+    """
+    Libera una reserva antes de su expiración.
+
+    Args:
+        hold_id (int): ID de la reserva.
+
+    Raises:
+        ValueError: Si la reserva no existe.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute(
+            """
+            WITH h AS (
+                DELETE FROM holds WHERE id=%s RETURNING event_id, user_id, qty
+            ), upd AS (
+                UPDATE events e SET seats_held = e.seats_held - h.qty, updated_at=now()
+                FROM h WHERE e.id = h.event_id
+            )
+            SELECT event_id, user_id, qty FROM h
+            """,
+            (hold_id,),
+        )
+        row = cur.fetchone()
+        if not row: raise ValueError("Reserva no existe")
+    event_id, user_id, qty = row
+    _event_cache.invalidate(event_id)
+    log_sale_operation(event_id, user_id, qty, "RELEASE")
+
+@retry_transaction
+def available(event_id: int) -> Optional[int]:
+    """
+    Cupos disponibles para vender o reservar (seats_total - seats_sold - seats_held).
+
+    Incluye los cupos libres repartidos en shards (ver domain.shard_event).
+
+    Returns:
+        Optional[int]: Cupos disponibles o None si el evento no existe.
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute(
+            """
+            SELECT seats_total - seats_sold - seats_held
+                   - COALESCE((SELECT SUM(s.seats_sold) FROM event_seat_shards s WHERE s.event_id = e.id), 0)
+            FROM events e WHERE id=%s
+            """,
+            (event_id,),
+        )
+        row = cur.fetchone()
+    return row[0] if row else None
+
+# ---------- Expiración ----------
+def release_expired(batch_size: int = HOLD_SWEEP_BATCH) -> int:
+    """
+    Libera todas las reservas expiradas, en lotes de ``batch_size`` por transacción.
+
+    Returns:
+        int: Cantidad total de reservas liberadas.
+    """
+    total = 0
+    while True:
+        with get_conn() as c, c.cursor() as cur:
+            n = _release_expired(cur, batch_size)
+        total += n
+        if n < batch_size:
+            break
+    if total:
+        log_operation("HOLD_EXPIRED", f"released={total}")
+    return total
+
+def start_sweeper(interval: float = 30.0) -> threading.Event:
+    """
+    Inicia un hilo daemon que ejecuta release_expired cada ``interval`` segundos.
+
+    Returns:
+        threading.Event: Evento que detiene el hilo al activarse (``set()``).
+    """
+    stop = threading.Event()
+    def run():
+        while not stop.wait(interval):
+            try:
+                release_expired()
+            except Exception as e:
+                log_operation("HOLD_SWEEP_ERROR", str(e))
+    threading.Thread(target=run, name="hold-sweeper", daemon=True).start()
+    return stop
@@ -0,0 +1,153 @@
+import csv
+import json
+import os
+import sys
+from typing import Iterator, List, Tuple
+from db import get_conn
+from domain import validate_event
+from interface.validations import (
+    validate_non_empty, validate_price, validate_int, parse_local_datetime_to_utc, normalize_category, NAME_MAX_LENGTH,
+)
+from logger import log_operation
+
+FIELDS = ("name", "description", "starts_at", "category", "price", "seats_total")
+# Un nombre de más de NAME_MAX_LENGTH caracteres o un INTEGER fuera de rango haría fallar el COPY de todo el lote
+INT_MAX = 2_147_483_647
+
+# ---------- Lectura ----------
+def read_rows(path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Lee un archivo CSV (con encabezado) o JSONL fila a fila, sin cargarlo completo en memoria.
+
+    Args:
+        path (str): Ruta del archivo; ``.jsonl`` se lee como JSON lines y cualquier otro como CSV.
+
+    Yields:
+        Tuple[int, dict]: Número de línea y fila cruda.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        raw = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raw = {"_error": f"JSON inválido: {e.msg}"}
+                    if not isinstance(raw, dict):
+                        raw = {"_error": "Se esperaba un objeto JSON"}
+                    yield line_no, raw
+        else:
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+
+# ---------- Validación ----------
+def validate_row(raw: dict) -> tuple:
+    """
+    Valida y normaliza una fila con las mismas reglas de la consola y de create_event.
+
+    Args:
+        raw (dict): Fila cruda con los campos de FIELDS.
+
+    Returns:
+        tuple: (name, description, starts_at, category, price, seats_total, seats_sold) listo para COPY.
+
+    Raises:
+        ValueError: Si algún campo es inválido.
+    """
+    if "_error" in raw:
+        raise ValueError(raw["_error"])
+    name = validate_non_empty(str(raw.get("name") or ""))
+    if not name:
+        raise ValueError("Nombre obligatorio")
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f"Nombre excede {NAME_MAX_LENGTH} caracteres")
+    description = str(raw.get("description") or "").strip()
+    starts_at = parse_local_datetime_to_utc(str(raw.get("starts_at") or ""))
+    if not starts_at:
+        raise ValueError("Fecha inválida")
+    category = normalize_category(str(raw.get("category") or ""))
+    if not category:
+        raise ValueError("Categoría inválida")
+    price = validate_price(str(raw.get("price", "")))
+    if price is None:
+        raise ValueError("Precio inválido")
+    try:
+        if price != int(price):
+            raise ValueError("Precio debe ser entero")
+    except OverflowError:
+        raise ValueError("Precio inválido")
+    if price > INT_MAX:
+        raise ValueError(f"Precio excede {INT_MAX}")
+    seats_total = validate_int(str(raw.get("seats_total", "")))
+    if seats_total is None:
+        raise ValueError("Cupos inválidos")
+    if seats_total > INT_MAX:
+        raise ValueError(f"Cupos exceden {INT_MAX}")
+    validate_event(category, int(price), seats_total)
+    return name, description, starts_at, category, int(price), seats_total, 0
+
+# ---------- Carga ----------
+def _copy_chunk(rows: List[tuple]) -> None:
+    """Carga un lote de filas válidas con COPY en su propia transacción."""
+    with get_conn() as c, c.cursor() as cur:
+        with cur.copy(
+            "COPY events(name,description,starts_at,category,price,seats_total,seats_sold) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+def import_events(path: str, chunk_size: int = 5000) -> dict:
+    """
+    Importa eventos desde CSV/JSONL validando cada fila y cargando las válidas con COPY por lotes.
+
+    Args:
+        path (str): Ruta del archivo a importar.
+        chunk_size (int, optional): Filas por transacción. Defaults to 5000.
+
+    Returns:
+        dict: Diccionario con (imported, errors), donde errors es una lista de (línea, mensaje).
+
+    Note:
+        Cada lote se confirma por separado: si un lote falla en la base de datos,
+        los anteriores quedan cargados y el error se informa para todas sus líneas.
+    """
+    imported = 0
+    errors = []
+    chunk, chunk_lines = [], []
+
+    def flush():
+        nonlocal imported
+        try:
+            _copy_chunk(chunk)
+            imported += len(chunk)
+        except Exception as e:
+            errors.extend((line_no, f"Error de carga: {e}") for line_no in chunk_lines)
+        chunk.clear(); chunk_lines.clear()
+
+    for line_no, raw in read_rows(path):
+        try:
+            chunk.append(validate_row(raw))
+            chunk_lines.append(line_no)
+        except ValueError as e:
+            errors.append((line_no, str(e)))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    log_operation("EVENT_IMPORT", f"file={os.path.basename(path)}, imported={imported}, errors={len(errors)}")
+    return {"imported": imported, "errors": errors}
+
+def main():
+    """
+    Importa el archivo indicado por línea de comandos e informa los errores por fila.
+    """
+    if len(sys.argv) != 2:
+        print("Uso: python importer.py <archivo.csv|archivo.jsonl>")
+        sys.exit(1)
+    result = import_events(sys.argv[1])
+    print(f"Eventos importados: {result['imported']}")
+    for line_no, msg in result["errors"]:
+        print(f" - Línea {line_no}: {msg}")
+
+if __name__ == "__main__":
+    main()
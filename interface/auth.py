@@ -2,6 +2,8 @@ import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from entities import UserData, ResponseLogin
 from domain import auth_user, create_user
+from sessions import issue as issue_session
+from ratelimit import LoginThrottled
 
 # ---------- Auth ----------
 class Auth():
@@ -19,7 +21,11 @@ class Auth():
         print("\n--- Iniciar sesión ---")
         username = input("Usuario: ")
         password = input("Contraseña: ")
-        auth = auth_user(username, password)
+        try:
+            auth = auth_user(username, password)
+        except LoginThrottled as e:
+            print(e)
+            return ResponseLogin(success=False)
         if not auth:
             print("Credenciales incorrectas.")
             return ResponseLogin(success=False)
@@ -27,7 +33,7 @@ class Auth():
         print(f"Bienvenido, {username}!")
         # mapear roles de dominio (admin/viewer) a interfaz (admin/user)
         ui_role = "admin" if role == "admin" else "user"
-        user = UserData(id=uid, username=username, role=ui_role)
+        user = UserData(id=uid, username=username, role=ui_role, token=issue_session(uid, username, role))
         return ResponseLogin(success=True, userData=user)
 
     def register(self):
@@ -42,7 +48,7 @@ class Auth():
         password = input("Elija una contraseña: ")
         try:
             uid = create_user(username, password, role="viewer")
-            user = UserData(id=uid, username=username, role="user")
+            user = UserData(id=uid, username=username, role="user", token=issue_session(uid, username, "viewer"))
             print(f"Usuario {username} registrado exitosamente.")
             return ResponseLogin(success=True, userData=user)
         except Exception as e:
@@ -20,7 +20,9 @@ class UserData(BaseModel):
         id (int): Identificador único del usuario.
         username (str): Nombre de usuario.
         role (str): Rol del usuario (admin o user).
+        token (Optional[str]): Token de sesión emitido al autenticarse.
     """
     id: int
     username: str
-    role: str
\ No newline at end of file
+    role: str
+    token: Optional[str] = None
\ No newline at end of file
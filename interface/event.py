@@ -1,8 +1,8 @@
 try:
-    from .validations import validate_non_empty, validate_price, validate_int, parse_local_datetime_to_utc, confirm_yes
+    from .validations import validate_non_empty, validate_price, validate_int, parse_local_datetime_to_utc, confirm_yes, normalize_category
     from .entities import UserData
 except ImportError:
-    from validations import validate_non_empty, validate_price, validate_int, parse_local_datetime_to_utc, confirm_yes
+    from validations import validate_non_empty, validate_price, validate_int, parse_local_datetime_to_utc, confirm_yes, normalize_category
     from entities import UserData
 from datetime import datetime, timezone
 import os, sys
@@ -28,6 +28,8 @@ class EventManager:
         0: {"name": "Volver", "action": "back"}
     }
 
+    page_size = 20
+
     def __init__(self):
         self._events = []
         self._id_counter = 1
@@ -85,12 +87,10 @@ class EventManager:
             return
         category = (input("Categoría (Charla/Taller/Show/Otro): ") or "").strip()
         # Normalizar categoría con capitalización como en BD
-        valid_cats = {"charla": "Charla", "taller": "Taller", "show": "Show", "otro": "Otro"}
-        cat_key = category.lower()
-        if cat_key not in valid_cats:
+        category = normalize_category(category)
+        if not category:
             print("Categoría inválida. Use: Charla/Taller/Show/Otro")
             return
-        category = valid_cats[cat_key]
         price = validate_price(input("Precio (entero): ") or "")
         if price is None:
             print("Precio inválido.")
@@ -139,8 +139,7 @@ class EventManager:
         keyword = (input("Filtro palabra clave (enter para omitir): ") or "")
         category = (input("Filtro categoría (Charla/Taller/Show/Otro, enter para omitir): ") or "").strip()
         if category:
-            valid_cats = {"charla": "Charla", "taller": "Taller", "show": "Show", "otro": "Otro"}
-            category = valid_cats.get(category.lower(), "")
+            category = normalize_category(category) or ""
             if not category:
                 print("Categoría inválida. Ignorando filtro.")
         date_from = input("Fecha desde (DD-MM-YYYY, enter para omitir): ") or ""
@@ -149,19 +148,27 @@ class EventManager:
         date_to = parse_local_datetime_to_utc(date_to) if date_to else None
         state = (input("Estado (proximos/pasados/agotados, enter para omitir): ") or "").lower()
         status = {"proximos": "upcoming", "pasados": "past", "agotados": "soldout"}.get(state, "")
-        try:
-            rows = d_list_events(q=keyword, category=category, status=status, dt_from=date_from, dt_to=date_to)
-        except Exception as e:
-            print(f"Error listando eventos: {e}")
-            return
-        if not rows:
-            print("No se encontraron eventos.")
-            return
-        for r in rows:
-            eid, name, starts_at, cat, price, seats_total, seats_sold = r
-            available = seats_total - seats_sold
-            start_local = starts_at.astimezone()
-            print(f"ID: {eid} | {name} | {start_local.strftime('%d-%m-%Y %H:%M %Z')} | Cat: {cat} | Precio: {price} | Disponibles: {available}/{seats_total}")
+        after = None
+        while True:
+            try:
+                rows = d_list_events(q=keyword, category=category, status=status, dt_from=date_from, dt_to=date_to,
+                                     after=after, limit=self.page_size)
+            except Exception as e:
+                print(f"Error listando eventos: {e}")
+                return
+            if not rows and after is None:
+                print("No se encontraron eventos.")
+                return
+            for r in rows:
+                eid, name, starts_at, cat, price, seats_total, seats_sold = r
+                available = seats_total - seats_sold
+                start_local = starts_at.astimezone()
+                print(f"ID: {eid} | {name} | {start_local.strftime('%d-%m-%Y %H:%M %Z')} | Cat: {cat} | Precio: {price} | Disponibles: {available}/{seats_total}")
+            if len(rows) < self.page_size:
+                return
+            if (input("Enter para ver más, 0 para terminar: ") or "").strip() == "0":
+                return
+            after = (rows[-1][2], rows[-1][0])
 
     def _show_details(self):
         try:
@@ -217,8 +224,7 @@ class EventManager:
                     print("Fecha inválida; ignorando cambio de fecha.")
             category = input("Categoría (Charla/Taller/Show/Otro) (enter para mantener): ").strip()
             if category:
-                valid_cats = {"charla": "Charla", "taller": "Taller", "show": "Show", "otro": "Otro"}
-                cat = valid_cats.get(category.lower())
+                cat = normalize_category(category)
                 if not cat:
                     print("Categoría inválida; ignorando cambio.")
                 else:
@@ -7,6 +7,8 @@ except ImportError:
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from domain import sell as d_sell, refund as d_refund, report_summary as d_report
+from reports import revenue_by
+from sessions import revoke as revoke_session
 
 class UserManager:
     """
@@ -62,6 +64,8 @@ class UserManager:
                 self._print_report()
             case 'logout':
                 print("Cerrando sesión...")
+                if self.get_user().token:
+                    revoke_session(self.get_user().token)
                 return True
             case 'exit':
                 print("Saliendo de la aplicación...")
@@ -81,6 +85,8 @@ class UserManager:
                 print("Gestionando usuarios...")
             case 'logout':
                 print("Cerrando sesión...")
+                if self.get_user().token:
+                    revoke_session(self.get_user().token)
                 return True
             case 'exit':
                 print("Saliendo de la aplicación...")
@@ -156,6 +162,11 @@ class UserManager:
                 print("Agotados:")
                 for eid, name in agotados:
                     print(f" - {eid}: {name}")
+            por_categoria = revenue_by("category")
+            if por_categoria:
+                print("Ingresos por categoría:")
+                for r in por_categoria:
+                    print(f" - {r['key']}: ${r['revenue']} | Netas: {r['net_tickets']} | Devolución: {r['refund_rate']:.1%}")
         except Exception as e:
             print(f"Error generando reporte: {e}")
 
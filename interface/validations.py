@@ -1,6 +1,9 @@
 from datetime import datetime, timezone
 from typing import Optional
 
+# events.name is VARCHAR(140)
+NAME_MAX_LENGTH = 140
+
 
 def validate_non_empty(value: str) -> Optional[str]:
     v = value.strip()
@@ -23,6 +26,14 @@ def validate_int(value: str) -> Optional[int]:
         return None
 
 
+VALID_CATEGORIES = {"charla": "Charla", "taller": "Taller", "show": "Show", "otro": "Otro"}
+
+
+def normalize_category(value: str) -> Optional[str]:
+    """Return the category with the capitalization stored in the DB, or None if invalid."""
+    return VALID_CATEGORIES.get(value.strip().lower())
+
+
 def parse_local_datetime_to_utc(value: str) -> Optional[datetime]:
     """Parse a local datetime string into UTC-aware datetime.
 
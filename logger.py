@@ -1,6 +1,114 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+from datetime import datetime, timezone
+import metrics
+
+# Modo asíncrono: los registros se encolan y un hilo escritor los vuelca en lotes
+LOG_ASYNC = os.getenv("LOG_ASYNC", "0") == "1"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "block")  # block | drop
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+
+# Formato del archivo (text | json) y rotación por tamaño o por tiempo
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOG_ROTATE_BYTES = int(os.getenv("LOG_ROTATE_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")  # p. ej. midnight, H
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+
+class _JsonFormatter(logging.Formatter):
+    """
+    Formatea cada registro como una línea JSON con los campos de la operación.
+    """
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+        }
+        if hasattr(record, "op"):
+            data["op"] = record.op
+            data.update(record.fields)
+        else:
+            data["msg"] = record.getMessage()
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler con cola acotada y política ante cola llena.
+
+    Con ``block`` quien registra espera a que haya espacio (backpressure);
+    con ``drop`` el registro se descarta y se contabiliza.
+    """
+    def __init__(self, q: queue.Queue, policy: str):
+        super().__init__(q)
+        self.policy = policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Se encola el registro sin formatear (con sus args): el formato lo aplica solo el hilo escritor
+        return copy.copy(record)
+
+    def enqueue(self, record):
+        if self.policy == "drop":
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                with self._dropped_lock:
+                    self.dropped += 1
+        else:
+            self.queue.put(record)
+
+class _BatchWriter(threading.Thread):
+    """
+    Hilo escritor que drena la cola en lotes y hace un solo flush por handler y lote.
+    """
+    _STOP = object()
+
+    def __init__(self, q: queue.Queue, handlers, batch_size: int):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = q
+        self.handlers = handlers
+        self.batch_size = batch_size
+
+    def run(self):
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is self._STOP:
+                batch.pop()
+                stop = True
+            for handler in self.handlers:
+                handler.acquire()
+                try:
+                    for record in batch:
+                        if record.levelno >= handler.level:
+                            if isinstance(handler, logging.handlers.BaseRotatingHandler) and handler.shouldRollover(record):
+                                handler.doRollover()
+                            handler.stream.write(handler.format(record) + handler.terminator)
+                    handler.flush()
+                except Exception:
+                    for record in batch:
+                        handler.handleError(record)
+                finally:
+                    handler.release()
+
+    def stop(self):
+        """Vacía la cola pendiente y detiene el hilo."""
+        self.queue.put(self._STOP)
+        self.join()
+
+_writer: _BatchWriter | None = None
 
 def setup_logger():
     """
@@ -20,11 +128,18 @@ def setup_logger():
     
     # Evitar duplicar handlers si ya existen
     if not logger.handlers:
-        # Handler para archivo
-        file_handler = logging.FileHandler(
-            os.path.join(log_dir, 'operations.log'), 
-            encoding='utf-8'
-        )
+        # Handler para archivo, con rotación por tiempo o por tamaño
+        log_path = os.path.join(log_dir, 'operations.log')
+        if LOG_ROTATE_WHEN:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+            )
+        elif LOG_ROTATE_BYTES > 0:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=LOG_ROTATE_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+            )
+        else:
+            file_handler = logging.FileHandler(log_path, encoding='utf-8')
         file_handler.setLevel(logging.INFO)
         
         # Handler para consola
@@ -37,17 +152,50 @@ def setup_logger():
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_JsonFormatter() if LOG_FORMAT == "json" else formatter)
         console_handler.setFormatter(formatter)
         
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        if LOG_ASYNC:
+            global _writer
+            q = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+            logger.addHandler(_BoundedQueueHandler(q, LOG_QUEUE_POLICY))
+            _writer = _BatchWriter(q, [file_handler, console_handler], LOG_BATCH_SIZE)
+            _writer.start()
+            atexit.register(_writer.stop)
+        else:
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
     
     return logger
 
+def log_stats():
+    """
+    Retorna métricas del modo de log asíncrono.
+    
+    Returns:
+        dict: Diccionario con (async, queued, dropped).
+    """
+    if _writer is None:
+        return {"async": False, "queued": 0, "dropped": 0}
+    handler = next(h for h in logger.handlers if isinstance(h, _BoundedQueueHandler))
+    return {"async": True, "queued": _writer.queue.qsize(), "dropped": handler.dropped}
+
 # Logger global
 logger = setup_logger()
 
+def _log(operation, fmt, args, fields):
+    """
+    Emite un registro INFO con formato diferido y campos estructurados.
+    
+    Args:
+        operation (str): Tipo de operación (p. ej. SALE_SALE).
+        fmt (str): Formato %-style del detalle; se aplica solo si algún handler lo escribe.
+        args (tuple): Argumentos del formato.
+        fields (dict): Campos tipados para el modo JSON.
+    """
+    with metrics.phase("logging"):
+        logger.info("%s: " + fmt, operation, *args, extra={"op": operation, "fields": fields})
+
 def log_operation(operation, details):
     """
     Registra una operación genérica en el log.
@@ -56,7 +204,8 @@ def log_operation(operation, details):
         operation (str): Tipo de operación a registrar.
         details (str): Detalles específicos de la operación.
     """
-    logger.info(f"{operation}: {details}")
+    if logger.isEnabledFor(logging.INFO):
+        _log(operation, "%s", (details,), {"details": details})
 
 def log_user_operation(user_id, username, operation, details=""):
     """
@@ -68,9 +217,11 @@ def log_user_operation(user_id, username, operation, details=""):
         operation (str): Tipo de operación (CREATE, AUTH_SUCCESS, etc.).
         details (str, optional): Detalles adicionales de la operación.
     """
-    log_operation(f"USER_{operation}", f"user_id={user_id}, username={username}, {details}")
+    if logger.isEnabledFor(logging.INFO):
+        _log(f"USER_{operation}", "user_id=%s, username=%s, %s", (user_id, username, details),
+             {"user_id": user_id, "username": username, "details": details})
 
-def log_event_operation(event_id, operation, details=""):
+def log_event_operation(event_id, operation, details="", **values):
     """
     Registra operaciones relacionadas con eventos.
     
@@ -78,10 +229,17 @@ def log_event_operation(event_id, operation, details=""):
         event_id (int): ID del evento.
         operation (str): Tipo de operación (CREATE, UPDATE, DELETE).
         details (str, optional): Detalles adicionales de la operación.
+        **values: Campos tipados (p. ej. name, price); se escriben como ``clave=valor`` en lugar de ``details``.
     """
-    log_operation(f"EVENT_{operation}", f"event_id={event_id}, {details}")
+    if logger.isEnabledFor(logging.INFO):
+        if values:
+            _log(f"EVENT_{operation}", "event_id=%s, " + ", ".join(f"{k}=%s" for k in values),
+                 (event_id, *values.values()), {"event_id": event_id, **values})
+        else:
+            _log(f"EVENT_{operation}", "event_id=%s, %s", (event_id, details),
+                 {"event_id": event_id, "details": details})
 
-def log_sale_operation(event_id, user_id, qty, operation_type):
+def log_sale_operation(event_id, user_id, qty, operation_type, latency_ms=None):
     """
     Registra operaciones de venta y devolución de entradas.
     
@@ -90,5 +248,13 @@ def log_sale_operation(event_id, user_id, qty, operation_type):
         user_id (int): ID del usuario que realiza la operación.
         qty (int): Cantidad de entradas.
         operation_type (str): Tipo de operación (SALE o REFUND).
+        latency_ms (float, optional): Duración de la operación en milisegundos.
     """
-    log_operation(f"SALE_{operation_type}", f"event_id={event_id}, user_id={user_id}, qty={qty}")
+    if logger.isEnabledFor(logging.INFO):
+        fields = {"event_id": event_id, "user_id": user_id, "qty": qty, "type": operation_type}
+        if latency_ms is None:
+            _log(f"SALE_{operation_type}", "event_id=%s, user_id=%s, qty=%s", (event_id, user_id, qty), fields)
+        else:
+            fields["latency_ms"] = round(latency_ms, 3)
+            _log(f"SALE_{operation_type}", "event_id=%s, user_id=%s, qty=%s, latency_ms=%.1f",
+                 (event_id, user_id, qty, latency_ms), fields)
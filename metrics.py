@@ -0,0 +1,192 @@
+import os
+import time
+import inspect
+import threading
+import functools
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Instrumentación opcional de latencias (METRICS=1 o enable()). Desactivada, cada punto
+# instrumentado solo consulta ENABLED.
+ENABLED = os.getenv("METRICS", "0") == "1"
+
+# Límites superiores (segundos) de los buckets del histograma
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PHASES = ("total", "acquire", "query", "bcrypt", "logging")
+
+_current = ContextVar("metrics_function", default="other")
+_hist = {}   # (función, fase) -> [conteos por bucket (+Inf al final), suma en segundos]
+_rows = {}   # función -> filas leídas
+_lock = threading.Lock()
+
+def enable() -> None:
+    """Activa la instrumentación."""
+    global ENABLED
+    ENABLED = True
+
+def disable() -> None:
+    """Desactiva la instrumentación (los datos acumulados se conservan)."""
+    global ENABLED
+    ENABLED = False
+
+def reset() -> None:
+    """Descarta los datos acumulados."""
+    with _lock:
+        _hist.clear()
+        _rows.clear()
+
+def _observe(function: str, phase: str, seconds: float) -> None:
+    i = bisect_left(BUCKETS, seconds)
+    with _lock:
+        h = _hist.get((function, phase))
+        if h is None:
+            h = _hist[(function, phase)] = [[0] * (len(BUCKETS) + 1), 0.0]
+        h[0][i] += 1
+        h[1] += seconds
+
+def observe_phase(phase: str, t0: float) -> None:
+    """
+    Registra el tiempo transcurrido desde ``t0`` (time.perf_counter) en una fase de la función en curso.
+
+    Args:
+        phase (str): acquire, query, bcrypt o logging.
+        t0 (float): Instante de inicio de la fase.
+    """
+    _observe(_current.get(), phase, time.perf_counter() - t0)
+
+def add_rows(n: int) -> None:
+    """Suma ``n`` filas leídas a la función en curso."""
+    function = _current.get()
+    with _lock:
+        _rows[function] = _rows.get(function, 0) + n
+
+class _Phase:
+    __slots__ = ("phase", "t0")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        observe_phase(self.phase, self.t0)
+
+class _NoPhase:
+    __slots__ = ()
+    def __enter__(self): pass
+    def __exit__(self, *exc): pass
+
+_NO_PHASE = _NoPhase()
+
+def phase(name: str):
+    """
+    Context manager que mide un bloque como fase de la función en curso.
+
+    Returns:
+        Context manager; sin costo de medición si la instrumentación está desactivada.
+    """
+    return _Phase(name) if ENABLED else _NO_PHASE
+
+def instrument(fn):
+    """
+    Decorador que registra la latencia total de ``fn`` y le atribuye las fases medidas durante su ejecución.
+
+    Acepta funciones síncronas y corutinas; la función en curso se propaga con contextvars, así que
+    también se atribuye correctamente entre tareas asyncio concurrentes.
+    """
+    name = f"{fn.__module__}.{fn.__name__}"
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            if not ENABLED:
+                return await fn(*args, **kwargs)
+            token = _current.set(name)
+            t0 = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _observe(name, "total", time.perf_counter() - t0)
+                _current.reset(token)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not ENABLED:
+            return fn(*args, **kwargs)
+        token = _current.set(name)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _observe(name, "total", time.perf_counter() - t0)
+            _current.reset(token)
+    return wrapper
+
+# ---------- Exportación ----------
+def _quantile(counts: list, q: float) -> float:
+    """Cuantil aproximado (límite superior del bucket que lo contiene), en segundos."""
+    target = q * sum(counts)
+    acc = 0
+    for i, c in enumerate(counts):
+        acc += c
+        if acc >= target and c:
+            return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return 0.0
+
+def dump() -> dict:
+    """
+    Retorna los datos acumulados.
+
+    Returns:
+        dict: ``{función: {"rows": n, "phases": {fase: {count, sum_ms, mean_ms, p50_ms, p99_ms}}}}``;
+        p50/p99 son el límite superior del bucket correspondiente.
+    """
+    with _lock:
+        hist = {k: (list(v[0]), v[1]) for k, v in _hist.items()}
+        rows = dict(_rows)
+    out = {}
+    for (function, phase_name), (counts, total) in sorted(hist.items()):
+        n = sum(counts)
+        entry = out.setdefault(function, {"rows": rows.get(function, 0), "phases": {}})
+        entry["phases"][phase_name] = {
+            "count": n,
+            "sum_ms": round(total * 1000, 3),
+            "mean_ms": round(total * 1000 / n, 4) if n else 0.0,
+            "p50_ms": _quantile(counts, 0.50) * 1000,
+            "p99_ms": _quantile(counts, 0.99) * 1000,
+        }
+    for function, n in rows.items():
+        out.setdefault(function, {"rows": n, "phases": {}})
+    return out
+
+def prometheus_text() -> str:
+    """
+    Retorna los datos acumulados en formato de texto de Prometheus.
+
+    Returns:
+        str: Histograma ``domain_latency_seconds{function,phase}`` y contador ``domain_rows_fetched_total{function}``.
+    """
+    with _lock:
+        hist = {k: (list(v[0]), v[1]) for k, v in _hist.items()}
+        rows = dict(_rows)
+    lines = [
+        "# HELP domain_latency_seconds Latencia de funciones del dominio por fase.",
+        "# TYPE domain_latency_seconds histogram",
+    ]
+    for (function, phase_name), (counts, total) in sorted(hist.items()):
+        labels = f'function="{function}",phase="{phase_name}"'
+        acc = 0
+        for le, c in zip(BUCKETS + ("+Inf",), counts):
+            acc += c
+            lines.append(f'domain_latency_seconds_bucket{{{labels},le="{le}"}} {acc}')
+        lines.append(f"domain_latency_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"domain_latency_seconds_count{{{labels}}} {acc}")
+    lines += [
+        "# HELP domain_rows_fetched_total Filas leídas por función del dominio.",
+        "# TYPE domain_rows_fetched_total counter",
+    ]
+    for function, n in sorted(rows.items()):
+        lines.append(f'domain_rows_fetched_total{{function="{function}"}} {n}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,148 @@
+import os
+import re
+import random
+import threading
+import psycopg
+from collections import deque
+from datetime import datetime, timezone
+from logger import log_operation
+
+# Registro de sentencias lentas en los cursores de db.get_conn. SLOW_QUERY_MS=0 lo desactiva;
+# una fracción SLOW_QUERY_EXPLAIN_SAMPLE de las lentas (solo SELECT) se repite con EXPLAIN ANALYZE.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+SLOW_QUERY_KEEP = int(os.getenv("SLOW_QUERY_KEEP", "100"))
+
+_recent = deque(maxlen=SLOW_QUERY_KEEP)
+_by_query = {}
+_lock = threading.Lock()
+_SPACES = re.compile(r"\s+")
+
+def enable(threshold_ms: float, explain_sample: float = SLOW_QUERY_EXPLAIN_SAMPLE) -> None:
+    """
+    Activa el registro de sentencias que tarden más de ``threshold_ms``.
+
+    Args:
+        threshold_ms (float): Umbral en milisegundos (> 0).
+        explain_sample (float, optional): Fracción (0 a 1) de sentencias lentas a las que se les captura el plan.
+    """
+    global SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_SAMPLE
+    SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_SAMPLE = threshold_ms, explain_sample
+
+def disable() -> None:
+    """Desactiva el registro (lo capturado se conserva)."""
+    global SLOW_QUERY_MS
+    SLOW_QUERY_MS = 0
+
+def clear() -> None:
+    """Descarta las sentencias capturadas."""
+    with _lock:
+        _recent.clear()
+        _by_query.clear()
+
+def _query_text(query, conn) -> str:
+    if not isinstance(query, (str, bytes)):
+        query = query.as_string(conn)
+    if isinstance(query, bytes):
+        query = query.decode()
+    return query
+
+def _shape(params) -> list:
+    """Forma de los parámetros (tipos, no valores), para no registrar datos de usuarios."""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {k: type(v).__name__ for k, v in params.items()}
+    return [type(v).__name__ for v in params]
+
+def _should_explain(text: str) -> bool:
+    # EXPLAIN ANALYZE ejecuta la sentencia: solo se repiten lecturas
+    return text.lstrip()[:6].upper() == "SELECT" and random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+
+def _explain_sql(text: str) -> str:
+    return "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + text
+
+def _record(text: str, params, elapsed_ms: float, plan) -> None:
+    normalized = _SPACES.sub(" ", text).strip()
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "ms": round(elapsed_ms, 3),
+        "query": normalized,
+        "params": _shape(params),
+        "plan": plan,
+    }
+    with _lock:
+        _recent.append(entry)
+        stats = _by_query.setdefault(normalized, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "plan": None})
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        if plan is not None:
+            stats["plan"] = plan
+    summary = ""
+    if plan is not None:
+        root = plan[0]["Plan"]
+        summary = f", plan={root['Node Type']}, exec_ms={plan[0].get('Execution Time')}"
+    log_operation("SLOW_QUERY", f"ms={elapsed_ms:.1f}, params={entry['params']}{summary}, query={normalized[:300]}")
+
+def trace(cursor, query, params, elapsed_ms: float) -> None:
+    """
+    Registra una sentencia de ``cursor`` si superó el umbral (llamado por db.TimedCursor).
+
+    El plan se captura en un cursor aparte dentro de un savepoint, de modo que un error en el
+    EXPLAIN no afecta la transacción ni los resultados pendientes de ``cursor``.
+    """
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    conn = cursor.connection
+    text = _query_text(query, conn)
+    plan = None
+    if _should_explain(text):
+        try:
+            # cursor simple (no TimedCursor) para no volver a registrar el EXPLAIN
+            with conn.transaction(), psycopg.Cursor(conn) as cur:
+                cur.execute(_explain_sql(text), params)
+                plan = cur.fetchone()[0]
+        except Exception as e:
+            log_operation("SLOW_QUERY_EXPLAIN_ERROR", str(e))
+    _record(text, params, elapsed_ms, plan)
+
+async def trace_async(cursor, query, params, elapsed_ms: float) -> None:
+    """Versión asíncrona de trace (llamada por db.TimedAsyncCursor)."""
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    conn = cursor.connection
+    text = _query_text(query, conn)
+    plan = None
+    if _should_explain(text):
+        try:
+            async with conn.transaction(), psycopg.AsyncCursor(conn) as cur:
+                await cur.execute(_explain_sql(text), params)
+                plan = (await cur.fetchone())[0]
+        except Exception as e:
+            log_operation("SLOW_QUERY_EXPLAIN_ERROR", str(e))
+    _record(text, params, elapsed_ms, plan)
+
+def slow_queries() -> list:
+    """
+    Retorna las últimas SLOW_QUERY_KEEP sentencias lentas.
+
+    Returns:
+        list: Registros con (at, ms, query, params, plan); ``plan`` es el JSON de EXPLAIN o None.
+    """
+    with _lock:
+        return list(_recent)
+
+def slow_query_stats() -> list:
+    """
+    Agrupa las sentencias lentas por texto (cada combinación de filtros de list_events tiene el suyo).
+
+    Returns:
+        list: Una fila por sentencia con (query, count, total_ms, max_ms, plan), de mayor a menor total_ms.
+    """
+    with _lock:
+        rows = [{"query": q, **dict(s)} for q, s in _by_query.items()]
+    for r in rows:
+        r["total_ms"] = round(r["total_ms"], 3)
+        r["max_ms"] = round(r["max_ms"], 3)
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
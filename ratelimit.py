@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LoginThrottled(ValueError):
+    """Intento de login rechazado por exceder el límite de intentos."""
+
+class TokenBucketLimiter:
+    """
+    Limitador token bucket por clave (usuario, cliente, ...) con memoria acotada.
+
+    Cada clave dispone de ``burst`` intentos que se recargan a ``rate_per_min`` por minuto.
+    Solo se guarda (tokens, último acceso) por clave; al superar ``max_keys`` se descartan
+    las claves usadas hace más tiempo, cuyo bucket normalmente ya está lleno. Cada
+    ``sweep_every`` llamadas a ``allow`` se eliminan además las claves ya recargadas.
+
+    Attributes:
+        allowed (int): Intentos permitidos.
+        throttled (int): Intentos rechazados.
+    """
+    def __init__(self, rate_per_min: float, burst: int, max_keys: int = 100_000, sweep_every: int = 1000):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self.sweep_every = sweep_every
+        self._calls = 0
+        self.allowed = 0
+        self.throttled = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key) -> bool:
+        """
+        Consume un token de ``key`` si hay disponible.
+
+        Returns:
+            bool: True si el intento está permitido.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            ok = tokens >= 1
+            self._buckets[key] = (tokens - 1 if ok else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            self._calls += 1
+            if self.sweep_every and self._calls >= self.sweep_every:
+                self._calls = 0
+                self._sweep(now)
+            if ok:
+                self.allowed += 1
+            else:
+                self.throttled += 1
+            return ok
+
+    def reset(self, key) -> None:
+        """Restaura el bucket completo de ``key`` (p. ej. tras un login exitoso)."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def sweep(self) -> int:
+        """
+        Elimina las claves cuyo bucket ya se recargó por completo.
+
+        Returns:
+            int: Cantidad de claves eliminadas.
+        """
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(self, now: float) -> int:
+        full = [k for k, (tokens, last) in self._buckets.items()
+                if tokens + (now - last) * self.rate >= self.burst]
+        for k in full:
+            del self._buckets[k]
+        return len(full)
+
+    def stats(self) -> dict:
+        """
+        Retorna los contadores del limitador.
+
+        Returns:
+            dict: Diccionario con (keys, allowed, throttled).
+        """
+        with self._lock:
+            return {"keys": len(self._buckets), "allowed": self.allowed, "throttled": self.throttled}
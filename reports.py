@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import List
+from db import get_conn
+
+# Clave de agrupación permitida -> expresión SQL sobre el rollup (r) y el evento (e)
+_GROUPS = {
+    "event": "e.id",
+    "category": "e.category",
+    "day": "date_trunc('day', r.hour, 'UTC')",
+    "hour": "r.hour",
+}
+
+def revenue_by(group: str = "event", dt_from: datetime = None, dt_to: datetime = None) -> List[dict]:
+    """
+    Calcula ingresos, entradas netas y tasa de devolución agrupados por evento, categoría, día u hora.
+
+    Args:
+        group (str, optional): Agrupación (event, category, day, hour). Defaults to "event".
+        dt_from (datetime, optional): Inicio del rango (por hora del movimiento, inclusive).
+        dt_to (datetime, optional): Fin del rango (exclusivo).
+
+    Returns:
+        List[dict]: Una fila por grupo con (key, tickets_sold, tickets_refunded, net_tickets, revenue, refund_rate).
+
+    Raises:
+        ValueError: Si la agrupación es inválida.
+
+    Note:
+        Se lee de ``sales_rollup_hourly`` (una fila por evento y hora), no de ``movements``.
+        El precio es el vigente al momento de cada movimiento.
+    """
+    if group not in _GROUPS:
+        raise ValueError("Agrupación inválida")
+    clauses = []; params = []
+    if dt_from: clauses += ["r.hour >= %s"]; params += [dt_from]
+    if dt_to:   clauses += ["r.hour < %s"]; params += [dt_to]
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    key = _GROUPS[group]
+    sql = f"""
+        SELECT {key}, SUM(r.tickets_sold)::bigint, SUM(r.tickets_refunded)::bigint,
+               SUM(r.gross_amount)::bigint, SUM(r.refunded_amount)::bigint
+        FROM sales_rollup_hourly r JOIN events e ON e.id = r.event_id{where}
+        GROUP BY 1 ORDER BY 1
+    """
+    with get_conn() as c, c.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    return [
+        {
+            "key": k,
+            "tickets_sold": sold,
+            "tickets_refunded": refunded,
+            "net_tickets": sold - refunded,
+            "revenue": gross - refunded_amount,
+            "refund_rate": (refunded / sold) if sold else 0.0,
+        }
+        for k, sold, refunded, gross, refunded_amount in rows
+    ]
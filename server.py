@@ -0,0 +1,374 @@
+import os
+import re
+import sys
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+import domain
+import holds
+import sessions
+from db import close_pool
+from reports import revenue_by
+from ratelimit import LoginThrottled
+from interface.validations import normalize_category, parse_local_datetime_to_utc, validate_non_empty, NAME_MAX_LENGTH
+from logger import log_operation
+import metrics
+import querytrace
+
+# Dirección, hilos que atienden conexiones y segundos de espera de una conexión keep-alive ociosa
+HTTP_HOST = os.getenv("HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.getenv("HTTP_PORT", "8000"))
+HTTP_WORKERS = int(os.getenv("HTTP_WORKERS", "32"))
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "5"))
+HTTP_MAX_BODY = 64 * 1024
+
+PAGE_SIZE = 20
+PAGE_SIZE_MAX = 100
+EVENT_FIELDS = ("id", "name", "starts_at", "category", "price", "seats_total", "seats_sold")
+EVENT_DETAIL_FIELDS = ("id", "name", "description", "starts_at", "category", "price", "seats_total", "seats_sold")
+UPDATABLE_FIELDS = ("name", "description", "starts_at", "category", "price", "seats_total")
+
+class HttpError(Exception):
+    """Error que se responde al cliente con el código HTTP indicado."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+# ---------- Conversión de parámetros ----------
+def _int(value, name: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HttpError(400, f"{name} debe ser un entero")
+
+def _datetime(value, name: str) -> datetime:
+    dt = parse_local_datetime_to_utc(value) if isinstance(value, str) else None
+    if dt is None: raise HttpError(400, f"{name} debe ser una fecha ISO 8601")
+    return dt
+
+def _category(value) -> str:
+    category = normalize_category(value) if isinstance(value, str) else None
+    if category is None: raise HttpError(400, "Categoría inválida")
+    return category
+
+def _name(value) -> str:
+    name = validate_non_empty(value) if isinstance(value, str) else None
+    if name is None: raise HttpError(400, "Nombre obligatorio")
+    if len(name) > NAME_MAX_LENGTH: raise HttpError(400, f"Nombre excede {NAME_MAX_LENGTH} caracteres")
+    return name
+
+def _description(value) -> str:
+    if value is None: return ""
+    if not isinstance(value, str): raise HttpError(400, "description debe ser texto")
+    return value.strip()
+
+def _event_dict(row: tuple, fields=EVENT_FIELDS) -> dict:
+    return dict(zip(fields, row))
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} no es serializable")
+
+# ---------- Endpoints ----------
+def login(req: dict):
+    body = req["body"]
+    token = sessions.login(str(body.get("username", "")), str(body.get("password", "")), req["client"])
+    if token is None: raise HttpError(401, "Credenciales inválidas")
+    session = sessions.validate(token)
+    return 200, {"token": token, "user_id": session["user_id"], "role": session["role"]}
+
+def logout(req: dict):
+    sessions.revoke(req["token"])
+    return 200, {"ok": True}
+
+def list_events(req: dict):
+    query = req["query"]
+    limit = min(_int(query.get("limit", PAGE_SIZE), "limit"), PAGE_SIZE_MAX)
+    if limit <= 0: raise HttpError(400, "limit debe ser > 0")
+    after = None
+    if "after_starts_at" in query or "after_id" in query:
+        after = (_datetime(query.get("after_starts_at"), "after_starts_at"), _int(query.get("after_id"), "after_id"))
+    rows = domain.list_events(
+        q=query.get("q", ""),
+        category=_category(query["category"]) if query.get("category") else "",
+        status=query.get("status", ""),
+        dt_from=_datetime(query["from"], "from") if "from" in query else None,
+        dt_to=_datetime(query["to"], "to") if "to" in query else None,
+        after=after,
+        limit=limit,
+    )
+    next_page = None
+    if len(rows) == limit:
+        next_page = {"after_starts_at": rows[-1][2], "after_id": rows[-1][0]}
+    return 200, {"events": [_event_dict(r) for r in rows], "next": next_page}
+
+def search_events(req: dict):
+    query = req["query"]
+    limit = min(_int(query.get("limit", PAGE_SIZE), "limit"), PAGE_SIZE_MAX)
+    offset = _int(query.get("offset", 0), "offset")
+    if limit <= 0 or offset < 0: raise HttpError(400, "limit debe ser > 0 y offset >= 0")
+    rows = domain.search_events(
+        query.get("q", ""),
+        category=_category(query["category"]) if query.get("category") else "",
+        dt_from=_datetime(query["from"], "from") if "from" in query else None,
+        dt_to=_datetime(query["to"], "to") if "to" in query else None,
+        limit=limit,
+        offset=offset,
+    )
+    next_page = {"offset": offset + limit} if len(rows) == limit else None
+    return 200, {"events": [_event_dict(r) for r in rows], "next": next_page}
+
+def get_event(req: dict, event_id: str):
+    row = domain.get_event(_int(event_id, "id"))
+    if row is None: raise HttpError(404, "Evento no existe")
+    return 200, _event_dict(row, EVENT_DETAIL_FIELDS)
+
+def create_event(req: dict):
+    body = req["body"]
+    missing = [f for f in UPDATABLE_FIELDS if f not in body]
+    if missing: raise HttpError(400, f"Faltan campos: {', '.join(missing)}")
+    event_id = domain.create_event(
+        _name(body["name"]), _description(body["description"]), _datetime(body["starts_at"], "starts_at"),
+        _category(body["category"]), _int(body["price"], "price"), _int(body["seats_total"], "seats_total"),
+    )
+    return 201, {"id": event_id}
+
+def update_event(req: dict, event_id: str):
+    body = req["body"]
+    fields = {k: body[k] for k in UPDATABLE_FIELDS if k in body}
+    if not fields: raise HttpError(400, "Sin campos para actualizar")
+    if "name" in fields: fields["name"] = _name(fields["name"])
+    if "description" in fields: fields["description"] = _description(fields["description"])
+    if "starts_at" in fields: fields["starts_at"] = _datetime(fields["starts_at"], "starts_at")
+    if "category" in fields: fields["category"] = _category(fields["category"])
+    for k in ("price", "seats_total"):
+        if k in fields:
+            fields[k] = _int(fields[k], k)
+            if fields[k] < 0: raise HttpError(400, f"{k} debe ser >= 0")
+    domain.update_event(_int(event_id, "id"), **fields)
+    return 200, {"id": int(event_id)}
+
+def delete_event(req: dict, event_id: str):
+    domain.delete_event(_int(event_id, "id"))
+    return 200, {"id": int(event_id)}
+
+def _movement(req: dict, event_id: str, mtype: str):
+    body = req["body"]
+    qty = _int(body.get("qty"), "qty")
+    key = body.get("idempotency_key") or req["headers"].get("Idempotency-Key")
+    apply = domain.sell if mtype == "SALE" else domain.refund
+    apply(_int(event_id, "id"), qty, req["session"]["user_id"], idempotency_key=key)
+    return 200, {"event_id": int(event_id), "type": mtype, "qty": qty}
+
+def sell(req: dict, event_id: str):
+    return _movement(req, event_id, "SALE")
+
+def refund(req: dict, event_id: str):
+    return _movement(req, event_id, "REFUND")
+
+def report_summary(req: dict):
+    rep = domain.report_summary()
+    return 200, {"total_events": rep["total_events"], "sum_available": rep["sum_available"],
+                 "sold_out": [{"id": eid, "name": name} for eid, name in rep["sold_out"]]}
+
+def report_revenue(req: dict):
+    query = req["query"]
+    rows = revenue_by(
+        query.get("group", "event"),
+        dt_from=_datetime(query["from"], "from") if "from" in query else None,
+        dt_to=_datetime(query["to"], "to") if "to" in query else None,
+    )
+    return 200, {"rows": rows}
+
+def health(req: dict):
+    return 200, {"ok": True}
+
+def metrics_text(req: dict):
+    return 200, metrics.prometheus_text()
+
+def slow_queries(req: dict):
+    return 200, {"recent": querytrace.slow_queries(), "by_query": querytrace.slow_query_stats()}
+
+# (método, ruta, endpoint, rol requerido: None = público, "viewer" = cualquier sesión, "admin")
+ROUTES = [
+    ("POST", r"/login", login, None),
+    ("POST", r"/logout", logout, "viewer"),
+    ("GET", r"/health", health, None),
+    ("GET", r"/metrics", metrics_text, "admin"),
+    ("GET", r"/admin/slow-queries", slow_queries, "admin"),
+    ("GET", r"/events", list_events, "viewer"),
+    ("POST", r"/events", create_event, "admin"),
+    ("GET", r"/events/search", search_events, "viewer"),
+    ("GET", r"/events/(\d+)", get_event, "viewer"),
+    ("PATCH", r"/events/(\d+)", update_event, "admin"),
+    ("DELETE", r"/events/(\d+)", delete_event, "admin"),
+    ("POST", r"/events/(\d+)/sell", sell, "viewer"),
+    ("POST", r"/events/(\d+)/refund", refund, "admin"),
+    ("GET", r"/reports/summary", report_summary, "viewer"),
+    ("GET", r"/reports/revenue", report_revenue, "viewer"),
+]
+_ROUTES = [(method, re.compile(pattern + "$"), fn, role) for method, pattern, fn, role in ROUTES]
+
+def _route(method: str, path: str):
+    """
+    Busca el endpoint de una ruta.
+
+    Returns:
+        tuple: (endpoint, argumentos de la ruta, rol requerido).
+
+    Raises:
+        HttpError: 404 si la ruta no existe, 405 si existe con otro método.
+    """
+    allowed = False
+    for m, pattern, fn, role in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            if m == method:
+                return fn, match.groups(), role
+            allowed = True
+    raise HttpError(405 if allowed else 404, "Método no permitido" if allowed else "Ruta no existe")
+
+# ---------- Servidor ----------
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Traduce cada request HTTP/JSON a una llamada del dominio.
+
+    Las sesiones se validan con ``Authorization: Bearer <token>`` (sessions.validate) y los
+    errores de negocio (ValueError) se responden como 400.
+    """
+    protocol_version = "HTTP/1.1"
+    timeout = HTTP_KEEPALIVE
+
+    def do_GET(self): self._dispatch("GET")
+    def do_POST(self): self._dispatch("POST")
+    def do_PATCH(self): self._dispatch("PATCH")
+    def do_DELETE(self): self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlparse(self.path)
+        try:
+            body = self._body()
+            fn, args, role = _route(method, url.path)
+            req = {
+                "query": {k: v[-1] for k, v in parse_qs(url.query).items()},
+                "body": body,
+                "headers": self.headers,
+                "client": self.client_address[0],
+                "token": "",
+                "session": None,
+            }
+            if role is not None:
+                req["token"], req["session"] = self._session(role)
+            status, payload = fn(req, *args)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except LoginThrottled as e:
+            status, payload = 429, {"error": str(e)}
+        except ValueError as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            log_operation("HTTP_ERROR", f"{method} {url.path}: {e!r}")
+            status, payload = 500, {"error": "Error interno"}
+        self._send(status, payload)
+
+    def _body(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # sin un largo válido no se puede ubicar la siguiente petición
+            raise HttpError(400, "Content-Length inválido")
+        if length > HTTP_MAX_BODY:
+            self.close_connection = True  # el cuerpo queda sin leer en el socket
+            raise HttpError(413, "Cuerpo demasiado grande")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            raise HttpError(400, "JSON inválido")
+        if not isinstance(body, dict): raise HttpError(400, "Se esperaba un objeto JSON")
+        return body
+
+    def _session(self, role: str):
+        auth = self.headers.get("Authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else ""
+        session = sessions.validate(token) if token else None
+        if session is None: raise HttpError(401, "Sesión inválida o expirada")
+        if role == "admin" and session["role"] != "admin": raise HttpError(403, "Requiere rol admin")
+        return token, session
+
+    def _send(self, status: int, payload) -> None:
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data, content_type = json.dumps(payload, default=_json_default, ensure_ascii=False).encode(), "application/json; charset=utf-8"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Las operaciones ya quedan en el log del dominio; no se escribe una línea por request
+        pass
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer que atiende las conexiones en un pool acotado de ``workers`` hilos.
+
+    El dominio libera el GIL mientras espera a PostgreSQL o calcula bcrypt, así que un pool de
+    hilos comparte el pool de conexiones del proceso sin abrir una conexión por cliente.
+    """
+    def __init__(self, address, handler, workers: int = HTTP_WORKERS):
+        super().__init__(address, handler)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+def make_server(host: str = HTTP_HOST, port: int = HTTP_PORT, workers: int = HTTP_WORKERS) -> PooledHTTPServer:
+    """
+    Crea el servidor HTTP (``port=0`` elige un puerto libre, ver ``server.server_address``).
+    """
+    return PooledHTTPServer((host, port), ApiHandler, workers)
+
+def main():
+    """
+    Inicia el servidor HTTP/JSON hasta Ctrl+C.
+    """
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else HTTP_PORT
+    server = make_server(port=port)
+    stop_sweeper = holds.start_sweeper()
+    stop_consolidator = domain.start_consolidator()
+    stop_compactor = domain.start_summary_compactor()
+    print(f"Escuchando en http://{server.server_address[0]}:{server.server_address[1]} ({HTTP_WORKERS} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_sweeper.set()
+        stop_consolidator.set()
+        stop_compactor.set()
+        server.server_close()
+        close_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+from db import get_conn
+from domain import auth_user
+from logger import log_user_operation
+
+# Firma de tokens, duración de la sesión y almacenamiento (memory | db)
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_MAX = int(os.getenv("SESSION_MAX", "100000"))
+# Con SESSION_STORE=db las sesiones se comparten entre procesos, que deben firmar con el mismo secreto
+if SESSION_STORE == "db" and not os.getenv("SESSION_SECRET"):
+    raise RuntimeError("SESSION_SECRET es obligatorio con SESSION_STORE=db")
+SESSION_SECRET = os.getenv("SESSION_SECRET", "").encode() or secrets.token_bytes(32)
+
+# ---------- Almacenamiento ----------
+class MemorySessionStore:
+    """
+    Sesiones en memoria del proceso, indexadas por ID de sesión en orden de emisión.
+
+    Las sesiones expiradas se descartan al consultarlas y, al alcanzar ``max_size``, desde la
+    más antigua; si todas siguen vigentes se descarta la más antigua. Cada alta cuesta O(1)
+    amortizado (con el TTL por defecto, la más antigua es la más próxima a expirar).
+    """
+    def __init__(self, max_size: int = SESSION_MAX):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, sid: str, session: dict) -> None:
+        with self._lock:
+            now = time.time()
+            while self._data and len(self._data) >= self.max_size:
+                oldest = next(iter(self._data.values()))
+                self._data.popitem(last=False)
+                if oldest["expires"] >= now:
+                    break
+            self._data[sid] = session
+
+    def get(self, sid: str) -> Optional[dict]:
+        with self._lock:
+            session = self._data.get(sid)
+            if session and session["expires"] < time.time():
+                del self._data[sid]
+                return None
+            return session
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep()
+
+    def _sweep(self) -> int:
+        now = time.time()
+        expired = [sid for sid, s in self._data.items() if s["expires"] < now]
+        for sid in expired:
+            del self._data[sid]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._data)
+
+class PgSessionStore:
+    """
+    Sesiones en la tabla ``sessions``, compartidas entre procesos.
+    """
+    def put(self, sid: str, session: dict) -> None:
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute(
+                "INSERT INTO sessions(id,user_id,username,role,expires_at) VALUES(%s,%s,%s,%s,%s)",
+                (sid, session["user_id"], session["username"], session["role"],
+                 datetime.fromtimestamp(session["expires"], timezone.utc)),
+            )
+
+    def get(self, sid: str) -> Optional[dict]:
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute(
+                "SELECT user_id, username, role, expires_at FROM sessions WHERE id=%s AND expires_at > now()",
+                (sid,),
+            )
+            row = cur.fetchone()
+        if not row:
+            return None
+        user_id, username, role, expires_at = row
+        return {"user_id": user_id, "username": username, "role": role, "expires": expires_at.timestamp()}
+
+    def delete(self, sid: str) -> None:
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute("DELETE FROM sessions WHERE id=%s", (sid,))
+
+    def sweep(self) -> int:
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute("DELETE FROM sessions WHERE expires_at <= now()")
+            return cur.rowcount
+
+_store = PgSessionStore() if SESSION_STORE == "db" else MemorySessionStore()
+
+# ---------- Tokens ----------
+def _sign(payload: str) -> str:
+    digest = hmac.new(SESSION_SECRET, payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def _parse(token: str) -> Optional[str]:
+    """Verifica firma y expiración del token; retorna el ID de sesión o None."""
+    try:
+        sid, expires, sig = token.split(".")
+        expires = int(expires)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(sig, _sign(f"{sid}.{expires}")) or expires < time.time():
+        return None
+    return sid
+
+def issue(user_id: int, username: str, role: str, ttl: int = SESSION_TTL) -> str:
+    """
+    Emite un token de sesión firmado para un usuario ya autenticado.
+
+    Args:
+        user_id (int): ID del usuario.
+        username (str): Nombre de usuario.
+        role (str): Rol del usuario (admin o viewer).
+        ttl (int, optional): Segundos de validez. Defaults to SESSION_TTL.
+
+    Returns:
+        str: Token con formato ``<sid>.<expira>.<firma>``.
+    """
+    sid = secrets.token_urlsafe(16)
+    expires = int(time.time()) + ttl
+    _store.put(sid, {"user_id": user_id, "username": username, "role": role, "expires": expires})
+    return f"{sid}.{expires}.{_sign(f'{sid}.{expires}')}"
+
+def login(username: str, password: str, client: str = "") -> Optional[str]:
+    """
+    Autentica con auth_user (bcrypt) y emite un token de sesión.
+
+    Returns:
+        Optional[str]: Token de sesión, o None si las credenciales son incorrectas.
+
+    Raises:
+        LoginThrottled: Si el usuario o el cliente excedieron el límite de intentos.
+    """
+    auth = auth_user(username, password, client)
+    if not auth:
+        return None
+    uid, role = auth
+    return issue(uid, username, role)
+
+def validate(token: str) -> Optional[dict]:
+    """
+    Valida un token sin volver a ejecutar bcrypt.
+
+    Args:
+        token (str): Token emitido por issue/login.
+
+    Returns:
+        Optional[dict]: Sesión con (user_id, username, role, expires) o None si es inválida, expiró o fue revocada.
+    """
+    sid = _parse(token)
+    if sid is None:
+        return None
+    return _store.get(sid)
+
+def revoke(token: str) -> None:
+    """
+    Revoca una sesión (logout). Tokens inválidos se ignoran.
+    """
+    sid = _parse(token)
+    if sid is None:
+        return
+    session = _store.get(sid)
+    _store.delete(sid)
+    if session:
+        log_user_operation(session["user_id"], session["username"], "LOGOUT", "")
+
+def sweep() -> int:
+    """
+    Elimina las sesiones expiradas del almacén.
+
+    Returns:
+        int: Cantidad de sesiones eliminadas.
+    """
+    return _store.sweep()
@@ -1,9 +1,9 @@
 from datetime import datetime, timedelta, UTC, timezone
 from domain import (
     auth_user, create_event, update_event, delete_event,
-    sell, refund, list_events, report_summary, create_user
+    sell, sell_many, refund, list_events, report_summary, create_user
 )
-from domain import get_event
+from domain import get_event, iter_events, check_summary, event_cache_stats, search_events
 from db import get_conn
 import bcrypt
 import threading
@@ -428,6 +428,643 @@ def main():
     except Exception as e:
         print_case("R16-01", "BD almacena TIMESTAMPTZ (UTC); UI muestra local", f"Error: {e}", False)
 
+    print("\n" + "=" * 60)
+    print("TEST RENDIMIENTO")
+    print("=" * 60)
+
+    # -------------------- P1-01 --------------------
+    try:
+        from db import pool_stats, DB_POOL_MAX
+        before = pool_stats()
+        for _ in range(5):
+            get_event(e)
+        after = pool_stats()
+        exito = (after["requests"] >= before["requests"] + 5 and 0 < after["size"] <= DB_POOL_MAX and after["in_use"] == 0)
+        print_case("P1-01", "Conexiones reutilizadas desde el pool", f"stats={after}", exito)
+    except Exception as ex:
+        print_case("P1-01", "Conexiones reutilizadas desde el pool", f"Error: {ex}", False)
+
+    # -------------------- P2-01 --------------------
+    try:
+        ea = create_event("Carrito A", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+        eb = create_event("Carrito B", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 2)
+        sell_many([(eb, 1), (ea, 2), (ea, 1)], uid)
+        rollback = False
+        try:
+            sell_many([(ea, 1), (eb, 5)], uid)
+        except Exception:
+            rollback = True
+        sold_a, sold_b = get_event(ea)[7], get_event(eb)[7]
+        exito = (sold_a == 3 and sold_b == 1 and rollback)
+        print_case("P2-01", "Carrito multi-evento todo o nada", f"sold_a={sold_a}, sold_b={sold_b}, rechazado={rollback}", exito)
+    except Exception as ex:
+        print_case("P2-01", "Carrito multi-evento todo o nada", f"Error: {ex}", False)
+
+    # -------------------- P3-01 --------------------
+    try:
+        import domain
+        domain.SALE_MODE = "conditional"
+        e = create_event("Race cond", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 1)
+        results = []
+        def t_cond():
+            try:
+                sell(e, 1, uid)
+                results.append("ok")
+            except Exception:
+                results.append("err")
+        th1 = threading.Thread(target=t_cond)
+        th2 = threading.Thread(target=t_cond)
+        th1.start(); th2.start(); th1.join(); th2.join()
+        over_refund = False
+        try:
+            refund(e, 2, uid)
+        except Exception:
+            over_refund = True
+        sold = get_event(e)[7]
+        exito = (results.count("ok")==1 and results.count("err")==1 and sold==1 and over_refund)
+        print_case("P3-01", "Venta condicional sin sobreventa", f"threads={results}, sold={sold}", exito)
+    except Exception as ex:
+        print_case("P3-01", "Venta condicional sin sobreventa", f"Error: {ex}", False)
+    finally:
+        domain.SALE_MODE = "lock"
+
+    # -------------------- P5-01 --------------------
+    try:
+        full = list_events()
+        paged = []
+        after = None
+        while True:
+            page = list_events(after=after, limit=2)
+            paged += page
+            if len(page) < 2:
+                break
+            after = (page[-1][2], page[-1][0])
+        streamed = list(iter_events(batch_size=2))
+        exito = ([r[0] for r in paged] == [r[0] for r in full] == [r[0] for r in streamed])
+        print_case("P5-01", "Paginación keyset y cursor de servidor", f"total={len(full)}, paginado={len(paged)}, stream={len(streamed)}", exito)
+    except Exception as ex:
+        print_case("P5-01", "Paginación keyset y cursor de servidor", f"Error: {ex}", False)
+
+    # -------------------- P6-01 --------------------
+    try:
+        import os, json, queue, logging, tempfile
+        from logger import _BoundedQueueHandler, _BatchWriter, _JsonFormatter
+        formatted_in = []
+        class Spy:
+            def __str__(self):
+                formatted_in.append(threading.current_thread().name)
+                return "spy"
+        log_dir6 = tempfile.mkdtemp()
+        json_handler = logging.handlers.RotatingFileHandler(os.path.join(log_dir6, "ops.log"), maxBytes=160, backupCount=5, encoding="utf-8")
+        json_handler.setFormatter(_JsonFormatter())
+        text_handler = logging.FileHandler(os.path.join(log_dir6, "text.log"), encoding="utf-8")
+        text_handler.setFormatter(logging.Formatter("%(message)s"))
+        q6 = queue.Queue(maxsize=5)
+        handler6 = _BoundedQueueHandler(q6, "drop")
+        log6 = logging.getLogger("test_p6"); log6.propagate = False; log6.setLevel(logging.INFO)
+        log6.addHandler(handler6)
+        for i in range(8):
+            log6.info("%s: %s", "OP", Spy(), extra={"op": "OP", "fields": {"i": i}})
+        formatted_before = list(formatted_in)
+        writer6 = _BatchWriter(q6, [json_handler, text_handler], 2)
+        writer6.start(); writer6.stop()
+        log6.removeHandler(handler6)
+        json_handler.close(); text_handler.close()
+        json_lines = []
+        for name in ("ops.log.5", "ops.log.4", "ops.log.3", "ops.log.2", "ops.log.1", "ops.log"):
+            path6 = os.path.join(log_dir6, name)
+            if os.path.exists(path6):
+                with open(path6, encoding="utf-8") as f:
+                    json_lines += [json.loads(l) for l in f]
+        with open(os.path.join(log_dir6, "text.log"), encoding="utf-8") as f:
+            text_lines = f.read().splitlines()
+        exito = (handler6.dropped == 3 and formatted_before == []
+                 and set(formatted_in) == {"log-writer"} and len(formatted_in) == 5
+                 and [l["i"] for l in json_lines][-1] == 4 and all(l["op"] == "OP" for l in json_lines)
+                 and os.path.exists(os.path.join(log_dir6, "ops.log.1"))
+                 and text_lines == ["OP: spy"] * 5)
+        print_case("P6-01", "Log asíncrono: formato en el hilo escritor, drop, JSON lines y rotación", f"dropped={handler6.dropped}, formateado_en={set(formatted_in)}", exito)
+    except Exception as ex:
+        print_case("P6-01", "Log asíncrono: formato en el hilo escritor, drop, JSON lines y rotación", f"Error: {ex}", False)
+
+    # -------------------- P7-01 --------------------
+    try:
+        import logging
+        import logger as logger7
+        records7 = []
+        class Capture7(logging.Handler):
+            def emit(self, record): records7.append(record)
+        capture7 = Capture7()
+        logger7.logger.addHandler(capture7)
+        try:
+            e7 = create_event("R7 Log", "x", datetime.now(UTC)+timedelta(days=1), "Show", 1500, 9)
+            update_event(e7, price=1600)
+        finally:
+            logger7.logger.removeHandler(capture7)
+        created7 = next(r.fields for r in records7 if r.op == "EVENT_CREATE")
+        updated7 = next(r.fields for r in records7 if r.op == "EVENT_UPDATE")
+        exito = (created7 == {"event_id": e7, "name": "R7 Log", "category": "Show", "price": 1500, "seats_total": 9}
+                 and updated7 == {"event_id": e7, "fields": ["price"]})
+        print_case("P7-01", "Log de eventos con campos tipados", f"create={created7}", exito)
+    except Exception as ex:
+        print_case("P7-01", "Log de eventos con campos tipados", f"Error: {ex}", False)
+
+    # -------------------- P8-01 --------------------
+    try:
+        before = report_summary()
+        e = create_event("Resumen", "x", datetime.now(UTC)+timedelta(days=1), "Otro", 0, 7)
+        sell(e, 2, uid)
+        after = report_summary()
+        check = check_summary()
+        from domain import compact_summary
+        compact_summary()
+        compacted = report_summary()
+        check_compacted = check_summary()
+        exito = (after["total_events"] == before["total_events"] + 1
+                 and after["sum_available"] == before["sum_available"] + 5
+                 and not any(check["drift"].values())
+                 and (compacted["total_events"], compacted["sum_available"]) == (after["total_events"], after["sum_available"])
+                 and not any(check_compacted["drift"].values()))
+        print_case("P8-01", "Resumen incremental sin deriva", f"antes={before['total_events']}/{before['sum_available']}, despues={after['total_events']}/{after['sum_available']}, drift={check['drift']}", exito)
+    except Exception as ex:
+        print_case("P8-01", "Resumen incremental sin deriva", f"Error: {ex}", False)
+
+    # -------------------- P8-02 --------------------
+    try:
+        from domain import start_summary_compactor
+        e8 = create_event("Resumen compactado", "x", datetime.now(UTC)+timedelta(days=1), "Otro", 0, 4)
+        sell(e8, 1, uid)
+        stop8 = start_summary_compactor(0.05)
+        time.sleep(0.5)
+        stop8.set()
+        with get_conn() as c, c.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM events_summary_delta")
+            pending8 = cur.fetchone()[0]
+        exito = pending8 == 0 and not any(check_summary()["drift"].values())
+        print_case("P8-02", "Compactación periódica del resumen", f"deltas_pendientes={pending8}", exito)
+    except Exception as ex:
+        print_case("P8-02", "Compactación periódica del resumen", f"Error: {ex}", False)
+
+    # -------------------- P9-01 --------------------
+    try:
+        from reports import revenue_by
+        e = create_event("Ingresos", "x", datetime.now(UTC)+timedelta(days=1), "Charla", 1000, 10)
+        sell(e, 3, uid)
+        refund(e, 1, uid)
+        rows = [r for r in revenue_by("event") if r["key"] == e]
+        r = rows[0] if rows else {}
+        exito = (r.get("tickets_sold") == 3 and r.get("net_tickets") == 2 and r.get("revenue") == 2000
+                 and abs(r.get("refund_rate", 0) - 1/3) < 1e-9)
+        print_case("P9-01", "Ingresos netos desde rollup de movimientos", f"rollup={r}", exito)
+    except Exception as ex:
+        print_case("P9-01", "Ingresos netos desde rollup de movimientos", f"Error: {ex}", False)
+
+    # -------------------- P10-01 --------------------
+    try:
+        import os, tempfile
+        from importer import import_events
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("name,description,starts_at,category,price,seats_total\n")
+            f.write("Importado OK,x,01-03-2027 20:00,show,1500,50\n")
+            f.write("Importado Mal,x,fecha,Show,1500,50\n")
+            f.write("Importado Mal,x,01-03-2027,Fiesta,1500,50\n")
+            f.write("Importado Mal,x,01-03-2027,Show,-1,50\n")
+            f.write("Importado " + "L" * 140 + ",x,01-03-2027 20:00,Show,1500,50\n")
+            f.write("Importado Mal,x,01-03-2027 20:00,Show,inf,50\n")
+            f.write("Importado Mal,x,01-03-2027 20:00,Show,3000000000,50\n")
+            f.write("Importado Mal,x,01-03-2027 20:00,Show,1500,3000000000\n")
+            path = f.name
+        result = import_events(path, chunk_size=2)
+        os.remove(path)
+        imported = [r for r in list_events(q="Importado") if r[1].startswith("Importado")]
+        exito = (result["imported"] == 1 and [l for l, _ in result["errors"]] == [3, 4, 5, 6, 7, 8, 9]
+                 and len(imported) == 1 and imported[0][3] == "Show")
+        for r in imported:
+            delete_event(r[0])
+        print_case("P10-01", "Importación masiva con errores por fila", f"imported={result['imported']}, errors={result['errors']}", exito)
+    except Exception as ex:
+        print_case("P10-01", "Importación masiva con errores por fila", f"Error: {ex}", False)
+
+    # -------------------- P10-02 --------------------
+    try:
+        import os, tempfile
+        from importer import import_events
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+            f.write("[1, 2]\nnull\n")
+            f.write('{"name": "ImportadoJ OK", "starts_at": "01-03-2027 20:00", "category": "Taller", "price": 0, "seats_total": 5}\n')
+            path = f.name
+        result = import_events(path)
+        os.remove(path)
+        imported = [r for r in list_events(q="ImportadoJ") if r[1].startswith("ImportadoJ")]
+        exito = result["imported"] == 1 and [l for l, _ in result["errors"]] == [1, 2] and len(imported) == 1
+        for r in imported:
+            delete_event(r[0])
+        print_case("P10-02", "Importación JSONL con líneas que no son objetos", f"imported={result['imported']}, errors={result['errors']}", exito)
+    except Exception as ex:
+        print_case("P10-02", "Importación JSONL con líneas que no son objetos", f"Error: {ex}", False)
+
+    # -------------------- P11-01 --------------------
+    try:
+        e = create_event("Cache", "x", datetime.now(UTC)+timedelta(days=1), "Show", 100, 5)
+        get_event(e)
+        hits_before = event_cache_stats()["hits"]
+        get_event(e)
+        cached = event_cache_stats()["hits"] == hits_before + 1
+        sell(e, 2, uid)
+        update_event(e, price=200)
+        row = get_event(e)
+        # Lectura concurrente con una venta: la fila leída antes de la invalidación no se guarda
+        from domain import _event_cache
+        since = _event_cache.version()
+        _event_cache.invalidate(e)
+        _event_cache.set(e, row, since)
+        stale_skipped = _event_cache.get(e) is None
+        exito = (cached and row[5] == 200 and row[7] == 2 and stale_skipped)
+        print_case("P11-01", "Caché de eventos con invalidación en escrituras", f"hit={cached}, price={row[5]}, sold={row[7]}", exito)
+    except Exception as ex:
+        print_case("P11-01", "Caché de eventos con invalidación en escrituras", f"Error: {ex}", False)
+
+    # -------------------- P12-01 --------------------
+    try:
+        from domain import list_query_stats
+        from db import DB_POOL_MAX
+        before = list_query_stats()
+        n = DB_POOL_MAX + 1  # más llamadas que conexiones: al menos una reutiliza la sentencia preparada
+        for _ in range(n):
+            list_events(category="Show", status="upcoming")
+        after = list_query_stats()
+        exito = (after["sql_cache_hits"] >= before["sql_cache_hits"] + n - 1
+                 and after["prepare_hits"] + after["prepares"] == before["prepare_hits"] + before["prepares"] + n
+                 and after["prepare_hits"] >= before["prepare_hits"] + 1)
+        print_case("P12-01", "SQL memorizado y sentencias preparadas reutilizadas", f"stats={after}", exito)
+    except Exception as ex:
+        print_case("P12-01", "SQL memorizado y sentencias preparadas reutilizadas", f"Error: {ex}", False)
+
+    # -------------------- P13-01 --------------------
+    try:
+        import asyncio
+        import domain_async
+        from db import close_async_pool
+        async def flujo_async():
+            try:
+                ea = await domain_async.create_event("Async", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 3)
+                res = await asyncio.gather(*(domain_async.sell(ea, 1, uid) for _ in range(5)), return_exceptions=True)
+                row = await domain_async.get_event(ea)
+                listed = [r[0] for r in await domain_async.list_events(q="Async")]
+                return ea, res, row, listed
+            finally:
+                await close_async_pool()
+        if sys.platform == "win32":
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        ea, res, row, listed = asyncio.run(flujo_async())
+        # Un segundo event loop reabre el pool con llamadas concurrentes desde el inicio
+        async def segundo_loop():
+            try:
+                return await asyncio.gather(domain_async.report_summary(), domain_async.list_events(q="Async"))
+            finally:
+                await close_async_pool()
+        _, listed2 = asyncio.run(segundo_loop())
+        oks = sum(1 for r in res if r is None)
+        exito = (oks == 3 and row[7] == 3 and ea in listed and ea in [r[0] for r in listed2])
+        print_case("P13-01", "API async sin sobreventa", f"ok={oks}, sold={row[7]}", exito)
+    except Exception as ex:
+        print_case("P13-01", "API async sin sobreventa", f"Error: {ex}", False)
+
+    # -------------------- P15-01 --------------------
+    try:
+        import sessions
+        u = f"r15s_{int(time.time())}"
+        create_user(u, "pw", "viewer")
+        token = sessions.login(u, "pw")
+        valid = sessions.validate(token)
+        forged = sessions.validate(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+        sessions.revoke(token)
+        revoked = sessions.validate(token)
+        store15 = sessions.MemorySessionStore(max_size=2)
+        for sid15 in ("a", "b", "c"):
+            store15.put(sid15, {"expires": time.time() + 60})
+        exito = (valid is not None and valid["username"] == u and valid["role"] == "viewer"
+                 and forged is None and revoked is None and sessions.login(u, "bad") is None
+                 and store15.get("a") is None and store15.get("c") is not None and len(store15) == 2)
+        print_case("P15-01", "Token de sesión firmado, validación y revocación", f"valid={valid is not None}, forged={forged}, revoked={revoked}", exito)
+    except Exception as ex:
+        print_case("P15-01", "Token de sesión firmado, validación y revocación", f"Error: {ex}", False)
+
+    # -------------------- P16-01 --------------------
+    try:
+        from ratelimit import LoginThrottled
+        from domain import login_rate_stats
+        u = f"r16_{int(time.time())}"
+        create_user(u, "pw", "viewer")
+        throttled_before = login_rate_stats()["user"]["throttled"]
+        results = []
+        for _ in range(8):
+            try:
+                results.append(auth_user(u, "bad"))
+            except LoginThrottled:
+                results.append("throttled")
+        exito = (results.count("throttled") >= 1 and results[0] is None
+                 and login_rate_stats()["user"]["throttled"] > throttled_before)
+        print_case("P16-01", "Intentos fallidos limitados antes de bcrypt", f"resultados={results}", exito)
+    except Exception as ex:
+        print_case("P16-01", "Intentos fallidos limitados antes de bcrypt", f"Error: {ex}", False)
+
+    # -------------------- P16-02 --------------------
+    try:
+        from ratelimit import TokenBucketLimiter
+        lim = TokenBucketLimiter(6000, 2, sweep_every=10)
+        for i in range(9):
+            lim.allow(f"k{i}")
+        keys_before = lim.stats()["keys"]
+        time.sleep(0.05)
+        lim.allow("k_last")
+        keys_after = lim.stats()["keys"]
+        exito = keys_before == 9 and keys_after == 1
+        print_case("P16-02", "Barrido perezoso de claves recargadas", f"antes={keys_before}, después={keys_after}", exito)
+    except Exception as ex:
+        print_case("P16-02", "Barrido perezoso de claves recargadas", f"Error: {ex}", False)
+
+    # -------------------- P17-01 --------------------
+    try:
+        import holds
+        e17 = create_event("R17 Holds", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+        h1 = holds.hold(e17, 3, uid)
+        expect_error(sell, e17, 3, uid)
+        h2 = holds.hold(e17, 2, uid, ttl=1)
+        avail_held = holds.available(e17)
+        holds.confirm(h1)
+        time.sleep(1.1)
+        expect_error(holds.confirm, h2)
+        released = holds.release_expired()
+        row = get_event(e17)
+        exito = (avail_held == 0 and row[7] == 3 and released >= 1 and holds.available(e17) == 2)
+        print_case("P17-01", "Reservas con expiración y confirmación", f"avail_held={avail_held}, sold={row[7]}, released={released}", exito)
+    except Exception as ex:
+        print_case("P17-01", "Reservas con expiración y confirmación", f"Error: {ex}", False)
+
+    # -------------------- P17-02 --------------------
+    try:
+        import holds
+        e17b = create_event("R17 Expiradas", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+        holds.hold(e17b, 4, uid, ttl=1)
+        e17c = create_event("R17 Expiradas carrito", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+        holds.hold(e17c, 4, uid, ttl=1)
+        time.sleep(1.1)
+        sell(e17b, 3, uid)
+        sell_many([(e17c, 3)], uid)
+        exito = (get_event(e17b)[7] == 3 and get_event(e17c)[7] == 3
+                 and holds.available(e17b) == 2 and holds.available(e17c) == 2)
+        print_case("P17-02", "Venta sin cupos libera reservas expiradas", f"available={holds.available(e17b)}", exito)
+    except Exception as ex:
+        print_case("P17-02", "Venta sin cupos libera reservas expiradas", f"Error: {ex}", False)
+
+    # -------------------- P18-01 --------------------
+    try:
+        import domain
+        mode_before = domain.SALE_MODE
+        domain.SALE_MODE = "sharded"
+        try:
+            e18 = create_event("R18 Shards", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 90)
+            sharded = domain.shard_event(e18, 8)
+            res18 = []
+            def t18():
+                try:
+                    sell(e18, 1, uid); res18.append("ok")
+                except Exception:
+                    res18.append("err")
+            threads = [threading.Thread(target=t18) for _ in range(120)]
+            for th in threads: th.start()
+            for th in threads: th.join()
+            refund(e18, 1, uid)
+            domain.consolidate_shards(e18)
+            row = get_event(e18)
+        finally:
+            domain.SALE_MODE = mode_before
+        exito = (sharded["shards"] == 8 and res18.count("ok") == 90 and row[7] == 89)
+        print_case("P18-01", "Ventas repartidas en shards sin sobreventa", f"ok={res18.count('ok')}, sold={row[7]}", exito)
+    except Exception as ex:
+        print_case("P18-01", "Ventas repartidas en shards sin sobreventa", f"Error: {ex}", False)
+
+    # -------------------- P18-02 --------------------
+    try:
+        import domain
+        mode_before = domain.SALE_MODE
+        domain.SALE_MODE = "sharded"
+        try:
+            e18b = create_event("R18 Shards consolidación", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 90)
+            domain.shard_event(e18b, 8)
+            sell(e18b, 11, uid)
+            refund(e18b, 11, uid)
+            sell(e18b, 85, uid)
+            domain.consolidate_shards(e18b)
+            row = get_event(e18b)
+        finally:
+            domain.SALE_MODE = mode_before
+        exito = row[7] == 85
+        print_case("P18-02", "Venta mayor que cualquier shard consolida en la transacción", f"sold={row[7]}", exito)
+    except Exception as ex:
+        print_case("P18-02", "Venta mayor que cualquier shard consolida en la transacción", f"Error: {ex}", False)
+
+    # -------------------- P19-01 --------------------
+    try:
+        from domain import idempotency_stats
+        e19 = create_event("R19 Idempotencia", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 10)
+        key19 = f"r19-{time.time_ns()}"
+        replays_before = idempotency_stats()["replays"]
+        sell(e19, 2, uid, idempotency_key=key19)
+        sell(e19, 2, uid, idempotency_key=key19)
+        expect_error(sell, e19, 3, uid, idempotency_key=key19)
+        refund(e19, 1, uid, idempotency_key=key19 + "-r")
+        refund(e19, 1, uid, idempotency_key=key19 + "-r")
+        row = get_event(e19)
+        exito = (row[7] == 1 and idempotency_stats()["replays"] - replays_before == 2)
+        print_case("P19-01", "Reintentos con clave de idempotencia no duplican", f"sold={row[7]}", exito)
+    except Exception as ex:
+        print_case("P19-01", "Reintentos con clave de idempotencia no duplican", f"Error: {ex}", False)
+
+    # -------------------- P19-02 --------------------
+    try:
+        from domain import idempotency_stats
+        e19b = create_event("R19 Reintentos concurrentes", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 10)
+        key19b = f"r19b-{time.time_ns()}"
+        sell(e19b, 1, uid, idempotency_key=key19b)
+        replays_before = idempotency_stats()["replays"]
+        threads = [threading.Thread(target=sell, args=(e19b, 1, uid), kwargs={"idempotency_key": key19b}) for _ in range(16)]
+        for th in threads: th.start()
+        for th in threads: th.join()
+        replays = idempotency_stats()["replays"] - replays_before
+        exito = replays == 16 and get_event(e19b)[7] == 1
+        print_case("P19-02", "Contador de reintentos exacto con hilos concurrentes", f"replays={replays}", exito)
+    except Exception as ex:
+        print_case("P19-02", "Contador de reintentos exacto con hilos concurrentes", f"Error: {ex}", False)
+
+    # -------------------- P20-01 --------------------
+    try:
+        import psycopg
+        from psycopg_pool import PoolTimeout, TooManyRequests
+        from db import retry_transaction, retry_stats, is_transient
+        calls20 = []
+        @retry_transaction
+        def flaky20():
+            calls20.append(1)
+            if len(calls20) < 3: raise psycopg.errors.DeadlockDetected("deadlock simulado")
+            return "ok"
+        @retry_transaction
+        def invalid20():
+            calls20.append(1)
+            raise ValueError("no transitorio")
+        @retry_transaction
+        def pool_timeout20():
+            calls20.append(1)
+            raise PoolTimeout("pool agotado simulado")
+        result20 = flaky20()
+        expect_error(invalid20)
+        try:
+            pool_timeout20()
+        except PoolTimeout:
+            pass
+        import db
+        attempts_before = db.DB_RETRY_ATTEMPTS
+        db.DB_RETRY_ATTEMPTS = 0
+        try:
+            no_retry20 = retry_transaction(lambda: "ok")()
+        finally:
+            db.DB_RETRY_ATTEMPTS = attempts_before
+        stats20 = retry_stats().get(f"{__name__}.flaky20", {})
+        exito = (result20 == "ok" and no_retry20 == "ok" and len(calls20) == 5 and stats20.get("retries") == 2 and stats20.get("recovered") == 1
+                 and not is_transient(PoolTimeout("x")) and not is_transient(TooManyRequests("x"))
+                 and is_transient(psycopg.OperationalError("conexión perdida")))
+        print_case("P20-01", "Reintento con backoff solo en errores transitorios", f"llamadas={len(calls20)}, stats={stats20}", exito)
+    except Exception as ex:
+        print_case("P20-01", "Reintento con backoff solo en errores transitorios", f"Error: {ex}", False)
+
+    # -------------------- P21-01 --------------------
+    try:
+        import json, http.client, server
+        httpd = server.make_server(port=0, workers=4)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        def call21(method, path, body=None, token=None):
+            conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            resp = conn.getresponse()
+            status, payload = resp.status, json.loads(resp.read())
+            conn.close()
+            return status, payload
+        try:
+            u = f"r21_{int(time.time())}"
+            create_user(u, "pw", "viewer")
+            st_login, login21 = call21("POST", "/login", {"username": u, "password": "pw"})
+            token21 = login21.get("token")
+            e21 = create_event("R21 Http", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+            st_anon, _ = call21("GET", "/events")
+            st_get, ev21 = call21("GET", f"/events/{e21}", token=token21)
+            st_sell, _ = call21("POST", f"/events/{e21}/sell", {"qty": 2}, token=token21)
+            st_over, _ = call21("POST", f"/events/{e21}/sell", {"qty": 9}, token=token21)
+            st_admin, _ = call21("DELETE", f"/events/{e21}", token=token21)
+            st_metrics, _ = call21("GET", "/metrics", token=token21)
+        finally:
+            httpd.shutdown(); httpd.server_close()
+        statuses = (st_login, st_anon, st_get, st_sell, st_over, st_admin, st_metrics)
+        exito = (statuses == (200, 401, 200, 200, 400, 403, 403) and ev21["name"] == "R21 Http" and get_event(e21)[7] == 2)
+        print_case("P21-01", "API HTTP: login, consulta, venta y permisos", f"status={statuses}", exito)
+    except Exception as ex:
+        print_case("P21-01", "API HTTP: login, consulta, venta y permisos", f"Error: {ex}", False)
+
+    # -------------------- P21-02 --------------------
+    try:
+        import json, http.client, server, sessions
+        httpd = server.make_server(port=0, workers=2)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        def call21b(method, path, body=None, token=None, headers=None):
+            conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+            conn.putrequest(method, path)
+            if token: conn.putheader("Authorization", f"Bearer {token}")
+            data = json.dumps(body).encode() if body is not None else b""
+            for k, v in (headers or {"Content-Length": str(len(data))}).items():
+                conn.putheader(k, v)
+            conn.endheaders(data)
+            resp = conn.getresponse()
+            status = resp.status
+            resp.read(); conn.close()
+            return status
+        try:
+            u = f"r21b_{int(time.time())}"
+            create_user(u, "pw", "admin")
+            token21b = sessions.login(u, "pw")
+            base21 = {"name": "R21 Valido", "description": None, "starts_at": "2027-03-01T20:00:00+00:00",
+                      "category": "Show", "price": 0, "seats_total": 5}
+            st_ok = call21b("POST", "/events", base21, token21b)
+            st_null = call21b("POST", "/events", {**base21, "name": None}, token21b)
+            st_empty = call21b("POST", "/events", {**base21, "name": "  "}, token21b)
+            st_long = call21b("POST", "/events", {**base21, "name": "L" * 141}, token21b)
+            st_neg = call21b("POST", "/events", token=token21b, headers={"Content-Length": "-1"})
+        finally:
+            httpd.shutdown(); httpd.server_close()
+        statuses = (st_ok, st_null, st_empty, st_long, st_neg)
+        created21 = [r for r in list_events(q="R21 Valido")]
+        exito = statuses == (201, 400, 400, 400, 400) and len(created21) == 1
+        for r in created21:
+            delete_event(r[0])
+        print_case("P21-02", "API HTTP: validación de nombre y Content-Length", f"status={statuses}", exito)
+    except Exception as ex:
+        print_case("P21-02", "API HTTP: validación de nombre y Content-Length", f"Error: {ex}", False)
+
+    # -------------------- P23-01 --------------------
+    try:
+        import metrics
+        metrics.reset(); metrics.enable()
+        try:
+            e23 = create_event("R23 Metricas", "x", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+            sell(e23, 1, uid)
+            list_events(limit=5)
+            dump23 = metrics.dump()
+            text23 = metrics.prometheus_text()
+        finally:
+            metrics.disable(); metrics.reset()
+        sell23 = dump23.get("domain.sell", {}).get("phases", {})
+        exito = (all(p in sell23 for p in ("total", "acquire", "query", "logging"))
+                 and dump23.get("domain.list_events", {}).get("rows", 0) >= 1
+                 and 'domain_latency_seconds_bucket{function="domain.sell",phase="total",le="+Inf"} 1' in text23)
+        print_case("P23-01", "Histogramas por función y fases (acquire/query/logging)", f"fases sell={sorted(sell23)}", exito)
+    except Exception as ex:
+        print_case("P23-01", "Histogramas por función y fases (acquire/query/logging)", f"Error: {ex}", False)
+
+    # -------------------- P24-01 --------------------
+    try:
+        import querytrace
+        querytrace.clear(); querytrace.enable(0.001, explain_sample=1.0)
+        try:
+            with get_conn() as c, c.cursor() as cur:
+                cur.execute("SELECT id FROM events WHERE name LIKE %s AND pg_sleep(0.01) IS NOT NULL LIMIT 1", ("R%",))
+                ok24 = cur.fetchall() is not None
+                cur.execute("SELECT 1")
+                ok24 = ok24 and cur.fetchone() == (1,)
+            stats24 = querytrace.slow_query_stats()
+            slow24 = [q for q in querytrace.slow_queries() if "pg_sleep" in q["query"]]
+        finally:
+            querytrace.disable(); querytrace.clear()
+        exito = (ok24 and len(slow24) == 1 and slow24[0]["params"] == ["str"]
+                 and slow24[0]["plan"] is not None and "Execution Time" in slow24[0]["plan"][0]
+                 and not any(s["query"].startswith("EXPLAIN") for s in stats24))
+        print_case("P24-01", "Sentencias lentas con forma de parámetros y plan EXPLAIN ANALYZE", f"capturadas={len(slow24)}", exito)
+    except Exception as ex:
+        print_case("P24-01", "Sentencias lentas con forma de parámetros y plan EXPLAIN ANALYZE", f"Error: {ex}", False)
+
+    # -------------------- P25-01 --------------------
+    try:
+        e25a = create_event("R25 Taller de cerámica", "Modelado en arcilla", datetime.now(UTC)+timedelta(days=1), "Taller", 0, 5)
+        e25b = create_event("R25 Concierto", "Incluye taller de cerámica al final", datetime.now(UTC)+timedelta(days=1), "Show", 0, 5)
+        found25 = [r[0] for r in search_events("ceramica", limit=100) if r[0] in (e25a, e25b)]
+        prefix25 = [r[0] for r in search_events("R25 conci", limit=100)]
+        update_event(e25b, name="R25 Recital")
+        renamed25 = [r[0] for r in search_events("recital R25", limit=100)]
+        exito = (found25 == [e25a, e25b] and prefix25 == [e25b] and renamed25 == [e25b]
+                 and search_events("  ") == [] and search_events("de") == [])
+        print_case("P25-01", "Búsqueda de texto completo sin acentos, por prefijo y ordenada por relevancia", f"orden={found25}", exito)
+    except Exception as ex:
+        print_case("P25-01", "Búsqueda de texto completo sin acentos, por prefijo y ordenada por relevancia", f"Error: {ex}", False)
+
     # -------------------- CLEANUP --------------------
     print("\n" + "=" * 60)
     print("CLEANUP - Eliminando datos de prueba")